@@ -1,64 +1,319 @@
 
 """Advanced analytics dashboard"""
+import functools
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
 import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+import plotly.io as pio
+import numpy as np
 import pandas as pd
 
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+try:
+    import numexpr
+    NUMEXPR_AVAILABLE = True
+except ImportError:
+    NUMEXPR_AVAILABLE = False
+
+try:
+    import orjson  # noqa: F401
+    pio.json.config.default_engine = 'orjson'
+except ImportError:
+    pass
+
+AGE_GROUP_LABELS = ['0-18', '19-35', '36-50', '50+']
+# Right-closed upper edges of the first three groups; ages outside (0, 100] are unbinned
+_AGE_GROUP_EDGES = np.array([18, 35, 50])
+
+# 2x2 overview grid: (x domain, y domain) per panel, matching make_subplots' default spacing
+_LEFT, _RIGHT = [0.0, 0.45], [0.55, 1.0]
+_TOP, _BOTTOM = [0.575, 1.0], [0.0, 0.425]
+_OVERVIEW_TITLES = (
+    ('Gender Distribution', _LEFT, _TOP),
+    ('Age Groups', _RIGHT, _TOP),
+    ('Education Levels', _LEFT, _BOTTOM),
+    ('Zonal Leaders', _RIGHT, _BOTTOM),
+)
+
+# Placeholder returned before any figure work when there are no caregivers
+_EMPTY_FIG = {
+    'data': [],
+    'layout': {'height': 600, 'annotations': [{'text': 'No data', 'showarrow': False}]},
+}
+
+# Below this many ages the NumPy path beats the JIT call overhead
+_NUMBA_MIN_ROWS = 100_000
+
+# numexpr's threaded evaluation only wins once the temporaries get large
+_NUMEXPR_MIN_ROWS = 100_000
+
+
+def _valid_ages(values):
+    """Boolean mask of ages inside (0, 100]; NaN is never valid"""
+    if NUMEXPR_AVAILABLE and values.size >= _NUMEXPR_MIN_ROWS:
+        return numexpr.evaluate('(values > 0) & (values <= 100)', local_dict={'values': values})
+    return (values > 0) & (values <= 100)
+
+
+if NUMBA_AVAILABLE:
+    @numba.njit(cache=True, boundscheck=False)
+    def _bin_ages(ages, edges, out):
+        """Write the AGE_GROUP_LABELS code of each age into out"""
+        for i in range(ages.size):
+            x = ages[i]
+            if not (x > 0 and x <= 100):  # also catches NaN
+                out[i] = -1
+                continue
+            code = 0
+            while code < edges.size and x > edges[code]:
+                code += 1
+            out[i] = code
+
+# Aggregate panels on worker threads once a scan outweighs the thread overhead
+_PARALLEL_MIN_ROWS = 200_000
+
+# Serialized figures (Figure or plain dict) keyed by (method name, data fingerprint)
+_FIGURE_CACHE_SIZE = 32
+_figure_json_cache = OrderedDict()
+_figure_cache_lock = threading.Lock()
+
+
+def _frame_fingerprint(df, columns):
+    """Cheap fingerprint of the columns a figure is built from"""
+    cols = [c for c in columns if c in df.columns]
+    if df.empty or not cols:
+        return (len(df), 0)
+    hashed = pd.util.hash_pandas_object(df[cols], index=False)
+    return (len(df), int(hashed.sum()))
+
+
+def _memoized_figure(cg_columns=(), ch_columns=()):
+    """Cache a figure's JSON payload until its input columns change; hits return a dict"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self):
+            key = (
+                method.__name__,
+                _frame_fingerprint(self.cg_df, cg_columns),
+                _frame_fingerprint(self.ch_df, ch_columns),
+            )
+            with _figure_cache_lock:
+                cached = _figure_json_cache.get(key)
+                if cached is not None:
+                    _figure_json_cache.move_to_end(key)
+            if cached is None:
+                fig = method(self)
+                if fig is None:
+                    return None
+                cached = pio.to_json(fig, validate=False)
+                with _figure_cache_lock:
+                    _figure_json_cache[key] = cached
+                    while len(_figure_json_cache) > _FIGURE_CACHE_SIZE:
+                        _figure_json_cache.popitem(last=False)
+            return json.loads(cached)
+        return wrapper
+    return decorator
+
+
+def _as_categories(df, columns):
+    """Return df with the given text columns stored as category dtype"""
+    converted = {
+        col: df[col].astype('category')
+        for col in columns
+        if col in df.columns
+        and not isinstance(df[col].dtype, pd.CategoricalDtype)
+        and (pd.api.types.is_object_dtype(df[col]) or pd.api.types.is_string_dtype(df[col]))
+    }
+    return df.assign(**converted) if converted else df
+
+
+def _compact_dtypes(df):
+    """Return df with ages as Int8 and timestamps at second resolution"""
+    converted = {}
+    if 'age' in df.columns and df['age'].dtype != 'Int8':
+        try:
+            converted['age'] = df['age'].astype('Int8')
+        except (TypeError, ValueError, OverflowError):
+            pass  # Fractional or out-of-range ages keep their dtype
+    if 'last_updated' in df.columns and df['last_updated'].dtype != 'datetime64[s]':
+        last_updated = df['last_updated']
+        if not pd.api.types.is_datetime64_any_dtype(last_updated):
+            # Timestamps repeat heavily (bulk imports), so the lookup cache pays off
+            last_updated = pd.to_datetime(last_updated, format='ISO8601',
+                                          cache=True, errors='coerce')
+        converted['last_updated'] = last_updated.astype('datetime64[s]')
+    return df.assign(**converted) if converted else df
+
+
 class AnalyticsDashboard:
+    CG_CATEGORY_COLS = ('gender', 'zonal_leader')
+    OVERVIEW_COLS = ('gender', 'age', 'zonal_leader')
+    CH_CATEGORY_COLS = ('child_education_level',)
+    AGG_CG_COLS = OVERVIEW_COLS + ('last_updated',)
+
     def __init__(self, cg_df, ch_df):
-        self.cg_df = cg_df
-        self.ch_df = ch_df
+        # Frames that are already categorical are passed through untouched
+        self.cg_df = _compact_dtypes(_as_categories(cg_df, self.CG_CATEGORY_COLS))
+        self.ch_df = _as_categories(ch_df, self.CH_CATEGORY_COLS)
+        self._cols = frozenset(self.cg_df.columns)
+        self._ch_cols = frozenset(self.ch_df.columns)
+        self._aggs = {}
+        self._aggs_stamp = None
+        self.refresh()
+    
+    @functools.cached_property
+    def age_bins(self):
+        """Caregiver age groups, binned once and shared by every age panel"""
+        if 'age' not in self._cols:
+            return None
+        return self._create_age_groups(self._overview_view['age'])
+    
+    def _narrow_overview(self):
+        """Compact copy of just the columns the overview panels scan"""
+        return self.cg_df[[c for c in self.OVERVIEW_COLS if c in self._cols]].copy()
+    
+    def notify_data_changed(self):
+        """Drop derived state after cg_df/ch_df were modified in place"""
+        self._cols = frozenset(self.cg_df.columns)
+        self._ch_cols = frozenset(self.ch_df.columns)
+        self._aggs_stamp = None
+        self.refresh()
+    
+    def refresh(self):
+        """Recompute the panel aggregates when the data has changed"""
+        # Same content fingerprint as the figure cache, so in-place value edits are seen too
+        stamp = (_frame_fingerprint(self.cg_df, self.AGG_CG_COLS),
+                 _frame_fingerprint(self.ch_df, self.CH_CATEGORY_COLS))
+        if stamp == self._aggs_stamp:
+            return
+        self.__dict__.pop('age_bins', None)
+        self._overview_view = self._narrow_overview()
+        # Plain pandas Series: the aggregates are O(n_categories), so Arrow buys nothing here
+        jobs = [self._caregiver_counts, self._child_counts, self._daily_counts]
+        if len(self.cg_df) + len(self.ch_df) >= _PARALLEL_MIN_ROWS:
+            # pandas releases the GIL inside its hashing/counting kernels
+            with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+                results = list(pool.map(lambda job: job(), jobs))
+        else:
+            results = [job() for job in jobs]
+        aggs = {}
+        for result in results:
+            aggs.update(result)
+        self._aggs = aggs
+        self._aggs_stamp = stamp
     
+    @_memoized_figure(cg_columns=('gender', 'age', 'zonal_leader', 'last_updated'),
+                      ch_columns=('child_education_level',))
     def create_overview_dashboard(self):
         """Create comprehensive overview dashboard"""
-        # Create subplots
-        fig = make_subplots(
-            rows=2, cols=2,
-            subplot_titles=('Gender Distribution', 'Age Groups', 
-                          'Education Levels', 'Zonal Leaders'),
-            specs=[[{"type": "pie"}, {"type": "bar"}],
-                   [{"type": "bar"}, {"type": "bar"}]]
-        )
+        if self.cg_df.empty:
+            return _EMPTY_FIG
+        
+        self.refresh()
+        counts = self._aggs
+        traces = []
         
         # Gender distribution pie chart
-        if not self.cg_df.empty and 'gender' in self.cg_df.columns:
-            gender_counts = self.cg_df['gender'].value_counts()
-            fig.add_trace(
-                go.Pie(labels=gender_counts.index, values=gender_counts.values,
-                       name="Gender"),
-                row=1, col=1
-            )
+        if 'gender' in counts:
+            gender_counts = counts['gender']
+            traces.append(dict(type='pie', labels=gender_counts.index.to_numpy(),
+                               values=gender_counts.to_numpy(),
+                               name="Gender", domain=dict(x=_LEFT, y=_TOP)))
         
         # Age groups bar chart
-        if not self.cg_df.empty and 'age' in self.cg_df.columns:
-            age_groups = self._create_age_groups(self.cg_df['age'])
-            age_counts = age_groups.value_counts()
-            fig.add_trace(
-                go.Bar(x=age_counts.index, y=age_counts.values,
-                       name="Age Groups"),
-                row=1, col=2
-            )
+        if 'age_bin' in counts:
+            age_counts = counts['age_bin']
+            traces.append(dict(type='bar', x=age_counts.index.to_numpy(), y=age_counts.to_numpy(),
+                               name="Age Groups", xaxis='x', yaxis='y'))
+        
+        # Children education levels bar chart
+        if 'child_education_level' in counts:
+            edu_counts = counts['child_education_level']
+            traces.append(dict(type='bar', x=edu_counts.index.to_numpy(), y=edu_counts.to_numpy(),
+                               name="Education Levels", xaxis='x2', yaxis='y2'))
         
-        fig.update_layout(height=600, showlegend=False)
-        return fig
+        # Zonal leaders bar chart
+        if 'zonal_leader' in counts:
+            zonal_counts = counts['zonal_leader']
+            traces.append(dict(type='bar', x=zonal_counts.index.to_numpy(),
+                               y=zonal_counts.to_numpy(),
+                               name="Zonal Leaders", xaxis='x3', yaxis='y3'))
+        
+        # Hand-built dict: the structure is fixed, so plotly's validator is skipped entirely
+        annotations = [
+            dict(text=title, x=sum(x) / 2, y=y[1], xref='paper', yref='paper',
+                 xanchor='center', yanchor='bottom', showarrow=False, font=dict(size=16))
+            for title, x, y in _OVERVIEW_TITLES
+        ]
+        layout = dict(
+            xaxis=dict(domain=_RIGHT, anchor='y'), yaxis=dict(domain=_TOP, anchor='x'),
+            xaxis2=dict(domain=_LEFT, anchor='y2'), yaxis2=dict(domain=_BOTTOM, anchor='x2'),
+            xaxis3=dict(domain=_RIGHT, anchor='y3'), yaxis3=dict(domain=_BOTTOM, anchor='x3'),
+            annotations=annotations, height=600, showlegend=False,
+        )
+        return {'data': traces, 'layout': layout}
     
+    @_memoized_figure(cg_columns=('last_updated',))
     def create_trend_analysis(self):
         """Create trend analysis charts"""
         # Registration trends over time
-        if 'last_updated' in self.cg_df.columns:
-            self.cg_df['registration_date'] = pd.to_datetime(self.cg_df['last_updated']).dt.date
-            daily_registrations = self.cg_df.groupby('registration_date').size().reset_index()
-            daily_registrations.columns = ['Date', 'Registrations']
-            
-            fig = px.line(daily_registrations, x='Date', y='Registrations',
-                         title='Daily Registration Trends')
+        self.refresh()
+        if 'daily_registrations' in self._aggs:
+            daily_registrations = self._aggs['daily_registrations']
+            # Named columns rather than bare arrays: px.line rejects an empty x/y pair
+            fig = px.line(daily_registrations.reset_index(), x='Date', y='Registrations',
+                          title='Daily Registration Trends')
             return fig
         return None
     
+    def _caregiver_counts(self):
+        """Count the caregiver panel columns straight from their category codes"""
+        if self.cg_df.empty:
+            return {}
+        panel = self._overview_view.drop(columns='age', errors='ignore')
+        counts = {col: panel[col].value_counts() for col in panel.columns}
+        # Categories taken from the data can outlive their last row; show only values present
+        counts = {col: values[values > 0] for col, values in counts.items()}
+        if self.age_bins is not None:
+            # Every age group keeps its bar, even with no caregivers in it
+            counts['age_bin'] = self.age_bins.value_counts()
+        return counts
+    
+    def _child_counts(self):
+        """Count children per education level"""
+        if self.ch_df.empty or 'child_education_level' not in self._ch_cols:
+            return {}
+        return {'child_education_level': self.ch_df['child_education_level'].value_counts()}
+    
+    def _daily_counts(self):
+        """Count registrations per calendar day"""
+        if 'last_updated' not in self._cols:
+            return {}
+        # Local series keeps the shared frame free of scratch columns
+        dates = self.cg_df['last_updated'].dt.floor('D')
+        daily_registrations = dates.value_counts().sort_index()
+        daily_registrations.index.name = 'Date'
+        daily_registrations.name = 'Registrations'
+        return {'daily_registrations': daily_registrations}
+    
     def _create_age_groups(self, ages):
         """Helper method to create age groups"""
         if ages.empty:
             return pd.Series([], dtype='object')
-        return pd.cut(ages, bins=[0, 18, 35, 50, 100], 
-                     labels=['0-18', '19-35', '36-50', '50+'])
+        values = ages.to_numpy(dtype='float64', na_value=np.nan)
+        if NUMBA_AVAILABLE and values.size >= _NUMBA_MIN_ROWS:
+            codes = np.empty(values.size, dtype=np.int8)
+            _bin_ages(values, _AGE_GROUP_EDGES, codes)
+        else:
+            codes = np.digitize(values, _AGE_GROUP_EDGES, right=True).astype(np.int8)
+            codes[~_valid_ages(values)] = -1
+        return pd.Series(pd.Categorical.from_codes(codes, categories=AGE_GROUP_LABELS),
+                         index=ages.index, name=ages.name)
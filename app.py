@@ -1,22 +1,24 @@
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import os
+import re
 import shutil
+import tempfile
+import threading
 from datetime import datetime
 from hashlib import sha1
 import logging
+import atexit
 import traceback
+from logging.handlers import QueueHandler, QueueListener
+from queue import Queue
 from io import BytesIO
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 from unverified_caregivers import render_unverified_caregivers_section, get_unverified_stats
 
-# Add PIL import for image handling
-try:
-    from PIL import Image
-    PIL_AVAILABLE = True
-except ImportError:
-    PIL_AVAILABLE = False
-
 try:
     import plotly.express as px
     import plotly.graph_objects as go
@@ -24,17 +26,37 @@ try:
 except ImportError:
     PLOTLY_AVAILABLE = False
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("app.log"),
-        logging.StreamHandler()
-    ]
-)
+try:
+    import xlsxwriter  # noqa: F401
+    XLSXWRITER_AVAILABLE = True
+except ImportError:
+    XLSXWRITER_AVAILABLE = False
+
+# st.fragment (Streamlit >= 1.37) reruns only the decorated section on its widget events;
+# on older versions the section simply reruns with the rest of the script
+fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda func: func)
+# st.download_button accepts a callable for data (built only when clicked) from Streamlit 1.52
+DEFERRED_DOWNLOADS = tuple(int(part) for part in st.__version__.split(".")[:2]) >= (1, 52)
+
+# Set up logging: records are queued and written by a listener thread, so the
+# script never waits on app.log. Streamlit reruns this file, so only set up once.
+if not any(isinstance(h, QueueHandler) for h in logging.getLogger().handlers):
+    _log_queue = Queue(-1)
+    _log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    _log_handlers = [logging.FileHandler("app.log"), logging.StreamHandler()]
+    for _handler in _log_handlers:
+        _handler.setFormatter(_log_formatter)
+    _log_listener = QueueListener(_log_queue, *_log_handlers, respect_handler_level=True)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+    _queue_handler = QueueHandler(_log_queue)
+    _queue_handler.setFormatter(logging.Formatter('%(message)s'))  # the listener's handlers do the formatting
+    logging.basicConfig(level=logging.INFO, handlers=[_queue_handler])
 logger = logging.getLogger(__name__)
 
+# Primary store: one Parquet table per sheet. The xlsx is only read once, to migrate legacy data.
+CAREGIVERS_PARQUET = "caregivers.parquet"
+CHILDREN_PARQUET = "children.parquet"
 EXCEL_PATH = "caregivers_database.xlsx"
 
 CAREGIVER_COLS = [
@@ -68,16 +90,172 @@ CHILD_COLS = [
     "last_updated"
 ]
 
+_NON_DIGIT = re.compile(r"\D")
+
+# Age group edges/labels: caregivers bin as [18, 30), ..., children as (5, 12], ...
+CG_AGE_EDGES = np.array([18, 30, 40, 50, 60])
+CG_AGE_LABELS = np.array(["Under 18", "18-29", "30-39", "40-49", "50-59", "60+", "Unknown"], dtype=object)
+CH_AGE_EDGES = np.array([5, 12, 17, 25])
+CH_AGE_LABELS = np.array(["0-5", "6-12", "13-17", "18-25", "26+", "Unknown"], dtype=object)
+# Coarser caregiver bands for the family charts, and the age at which each school level is expected to start
+FAMILY_AGE_EDGES = np.array([30, 40, 50])
+FAMILY_AGE_LABELS = np.array(["Under 30", "30-39", "40-49", "50+", "Unknown"], dtype=object)
+EXPECTED_EDU_AGES = np.array([6, 12, 15, 18, 21])
+# Education levels in hierarchy order; a level's category code indexes its score
+EDU_LEVELS = pd.CategoricalDtype(["Pre-primary", "Primary", "Junior Secondary", "O'Level",
+                                  "Senior Secondary", "Vocational", "Tertiary", "Graduate"], ordered=True)
+EDU_LEVEL_VALUES = np.array([1, 2, 3, 4, 5, 5.5, 6, 7])
+
+# Common Nigerian cities/areas matched (case-insensitively) in caregiver addresses
+CITIES = ['lagos', 'abuja', 'kano', 'ibadan', 'port harcourt', 'benin', 'kaduna',
+          'jos', 'ilorin', 'aba', 'onitsha', 'warri', 'calabar', 'uyo', 'enugu', 'isolo', 'ilasamaja']
+
 def stable_key(name: str, phone: str) -> str:
+    # Stays sha1: stored keys were derived with it, and upserts must find them again
     name = (name or "").strip().lower()
-    phone = "".join(ch for ch in (phone or "") if ch.isdigit())
+    phone = _NON_DIGIT.sub("", phone or "")
     raw = f"{name}|{phone}"
-    return sha1(raw.encode("utf-8")).hexdigest()[:12] if raw.strip("|") else sha1(os.urandom(16)).hexdigest()[:12]
+    return sha1(raw.encode("utf-8")).hexdigest()[:12] if raw.strip("|") else os.urandom(6).hex()
+
+def stable_keys(names: pd.Series, phones: pd.Series) -> pd.Series:
+    """stable_key over whole columns: text cleanup runs column-wise, only the sha1 is per value"""
+    raw = _clean_text(names).str.lower() + "|" + _clean_text(phones).str.replace(_NON_DIGIT, "", regex=True)
+    return pd.Series([sha1(r.encode("utf-8")).hexdigest()[:12] if r.strip("|") else os.urandom(6).hex() for r in raw],
+                     index=raw.index, dtype=object)
 
 def validate_phone_number(phone):
     """No phone number validation - accepts anything"""
     return True
 
+def valid_phone_numbers(phones: pd.Series) -> np.ndarray:
+    """validate_phone_number over a whole column at once, as a bool array"""
+    return np.ones(len(phones), dtype=bool)  # every number is accepted
+
+def _whole_numbers(values) -> pd.Series:
+    """Column-wise int(x) for ages and counts: fractions truncate, blanks become <NA>"""
+    return np.trunc(pd.to_numeric(pd.Series(values), errors="coerce")).astype("Int64")
+
+def _small_ints(values) -> pd.Series:
+    """_whole_numbers downcast to the narrowest nullable int that fits (Int8 for ages)"""
+    return pd.to_numeric(_whole_numbers(values), downcast="integer")
+
+def age_groups(ages: pd.Series, edges: np.ndarray, labels: np.ndarray, right: bool = False) -> np.ndarray:
+    """Label each age with its group via np.digitize; missing ages get the last label"""
+    values = pd.to_numeric(ages, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    codes = np.digitize(values, edges, right=right)
+    codes[np.isnan(values)] = len(labels) - 1
+    return labels[codes]
+
+def isin_mask(values: pd.Series, selected) -> np.ndarray:
+    """values.isin(selected) as a bool array; categoricals compare integer codes"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        categories = values.cat.categories
+        wanted = categories.get_indexer([v for v in selected if v in categories])
+        return np.isin(values.cat.codes.to_numpy(), wanted)
+    return values.isin(selected).to_numpy()
+
+def _clean_text(values: pd.Series) -> pd.Series:
+    """Column-wise str(x or "").strip(): nulls become empty strings"""
+    return values.fillna("").astype(str).str.strip()
+
+# Free-text child columns the edit editors expect as strings
+EDITOR_TEXT_COLS = ["child_school_name", "child_class_level", "child_profession", "child_gender", "child_phone_number"]
+
+def editor_height(n_rows: int) -> int:
+    """Pixel height fitting a children editor's header, rows and add-row line, capped at 400"""
+    return min(35 * (n_rows + 2) + 3, 400)
+
+def validate_children(edited: pd.DataFrame):
+    """Return (rows with details but no name, rows with an invalid phone) from a children editor"""
+    names = _clean_text(edited["child_name"])
+    phones = _clean_text(edited["child_phone_number"])
+    has_details = (phones.ne("") | edited["child_age"].notna() | edited["child_date_of_birth"].notna()
+                   | _clean_text(edited["child_education_level"]).ne("")
+                   | _clean_text(edited["child_profession"]).ne(""))
+    missing = names.eq("") & has_details
+    invalid = phones.ne("").to_numpy() & ~valid_phone_numbers(phones)
+    missing_child_names = [f"Row {i+1}" for i in edited.index[missing.to_numpy()]]
+    invalid_child_phones = [f"Row {i+1}: {name or 'Unnamed'}"
+                            for i, name in zip(edited.index[invalid], names[invalid])]
+    return missing_child_names, invalid_child_phones
+
+def build_children_frame(edited: pd.DataFrame, key: str, caregiver_name: str,
+                         caregiver_phone: str | None, now: str) -> pd.DataFrame:
+    """Turn a children editor into CHILD_COLS rows, dropping rows without a name"""
+    names = _clean_text(edited["child_name"])
+    keep = names.ne("").to_numpy()
+    rows = edited.loc[keep]
+    n = int(keep.sum())
+
+    # Use caregiver's phone number where the child's is empty
+    phones = _clean_text(rows["child_phone_number"])
+    if caregiver_phone is not None:
+        phones = phones.where(phones.ne(""), caregiver_phone.strip())
+
+    dobs = pd.to_datetime(rows["child_date_of_birth"], errors="coerce")
+    ages = _whole_numbers(rows["child_age"])
+
+    return pd.DataFrame({
+        "caregiver_key": np.full(n, key, dtype=object),
+        "caregiver_name": np.full(n, caregiver_name.strip(), dtype=object),
+        "child_name": names.to_numpy()[keep],
+        "child_gender": _clean_text(rows["child_gender"]).to_numpy(),
+        "child_phone_number": phones.to_numpy(),
+        "child_age": ages.array,
+        "child_date_of_birth": dobs.dt.date.where(dobs.notna(), None).to_numpy(),
+        "child_education_level": _clean_text(rows["child_education_level"]).to_numpy(),
+        "child_school_name": _clean_text(rows["child_school_name"]).to_numpy(),
+        "child_class_level": _clean_text(rows["child_class_level"]).to_numpy(),
+        "child_profession": _clean_text(rows["child_profession"]).to_numpy(),
+        "last_updated": np.full(n, now, dtype=object),
+    }, columns=CHILD_COLS)
+
+def _set_cell(df: pd.DataFrame, pos: int, col: str, value):
+    """df.iloc[pos][col] = value, widening the column when it cannot hold value"""
+    values = df[col]
+    if (isinstance(values.dtype, pd.CategoricalDtype) and not pd.isna(value)
+            and value not in values.cat.categories):
+        df[col] = values.cat.add_categories([value])
+    try:
+        df.iloc[pos, df.columns.get_loc(col)] = value
+    except (TypeError, ValueError):
+        df[col] = df[col].astype(object)
+        df.iloc[pos, df.columns.get_loc(col)] = value
+
+def _key_indexed(df: pd.DataFrame) -> pd.DataFrame:
+    """Index rows by caregiver_key (kept as a column too) for hash lookups"""
+    return df.set_index("caregiver_key", drop=False).rename_axis(None)
+
+def _rows_for(df: pd.DataFrame, key: str) -> pd.DataFrame:
+    """Rows of a key-indexed frame stored under key"""
+    pos = df.index.get_indexer_for([key])
+    return df.iloc[pos[pos >= 0]]
+
+def upsert_caregiver(cg_df: pd.DataFrame, row: dict, old_key: str | None = None) -> pd.DataFrame:
+    """Overwrite the caregiver stored under row's key (or old_key); append if absent. cg_df is not modified"""
+    key = row["caregiver_key"]
+    pos = cg_df.index.get_indexer_for(list({key, old_key or key}))
+    pos = np.sort(pos[pos >= 0])
+    if len(pos) == 0:
+        return pd.concat([cg_df, _key_indexed(pd.DataFrame([row]))])
+    # Edit a copy: the loaded frames are shared across reruns through st.session_state
+    if len(pos) > 1:
+        cg_df = cg_df.iloc[np.setdiff1d(np.arange(len(cg_df)), pos[1:])].copy()
+    else:
+        cg_df = cg_df.copy()
+    for col, value in row.items():
+        _set_cell(cg_df, pos[0], col, value)
+    if cg_df.index[pos[0]] != key:
+        cg_df = cg_df.rename(index={cg_df.index[pos[0]]: key})
+    return cg_df
+
+def replace_children(ch_df: pd.DataFrame, key: str, children: pd.DataFrame) -> pd.DataFrame:
+    """Drop the children linked to key and append the new set"""
+    ch_df = ch_df.drop(index=key, errors="ignore")
+    if children.empty:
+        return ch_df
+    return pd.concat([ch_df, _key_indexed(children)])
+
 def calculate_age(dob):
     """Calculate age from date of birth."""
     if not dob:
@@ -85,95 +263,752 @@ def calculate_age(dob):
     today = datetime.now().date()
     return today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
 
-def ensure_excel():
-    if not os.path.exists(EXCEL_PATH):
+def parse_dates(values: pd.Series) -> pd.Series:
+    """Timestamps for a column of imported dates; ISO 8601 in one pass, other formats element-wise"""
+    parsed = pd.to_datetime(values, errors="coerce", format="ISO8601")
+    rest = parsed.isna() & values.notna()
+    if rest.any():
+        parsed[rest] = pd.to_datetime(values[rest], errors="coerce", format="mixed")
+    return parsed
+
+def parse_import_dates(import_df: pd.DataFrame) -> pd.DataFrame:
+    """Copy of an import sheet with its date-of-birth columns parsed up front"""
+    import_df = import_df.copy()
+    for col in DATE_COLS.intersection(import_df.columns):
+        import_df[col] = parse_dates(import_df[col])
+    return import_df
+
+def _import_caregivers(import_df: pd.DataFrame, cg_df: pd.DataFrame) -> pd.DataFrame:
+    """cg_df with the caregivers of an import sheet upserted; the last row per key wins"""
+    import_df = parse_import_dates(import_df)
+    imported_caregivers = {}
+    names = _clean_text(import_df["caregiver_name"])
+    phones = _clean_text(import_df.get("phone_number", pd.Series("", index=import_df.index)))
+    keys = stable_keys(names, phones)
+    now = datetime.utcnow().isoformat()
+    for (_, row), name, phone, key in zip(import_df.iterrows(), names, phones, keys):
+        if not name:
+            continue
+
+        imported_caregivers.pop(key, None)
+        imported_caregivers[key] = {
+            "caregiver_key": key,
+            "caregiver_name": name,
+            "gender": str(row.get("gender") or "").strip(),
+            "profession": str(row.get("profession") or "").strip(),
+            "date_of_birth": row.get("date_of_birth").date() if pd.notna(row.get("date_of_birth")) else None,
+            "age": int(row.get("age")) if pd.notna(row.get("age")) else None,
+            "phone_number": phone,
+            "address": str(row.get("address") or "").strip(),
+            "zonal_leader": str(row.get("zonal_leader") or "").strip(),
+            "bank": str(row.get("bank") or "").strip(),
+            "account_number": str(row.get("account_number") or "").strip(),
+            "number_of_kids": int(row.get("number_of_kids")) if pd.notna(row.get("number_of_kids")) else None,
+            "last_updated": now
+        }
+
+    if not imported_caregivers:
+        return cg_df
+    # Remove existing caregivers with the same keys, then append all imported rows in one concat
+    cg_df = cg_df.drop(index=list(imported_caregivers), errors="ignore")
+    return pd.concat([cg_df, _key_indexed(pd.DataFrame(list(imported_caregivers.values())))])
+
+def _import_children(import_df: pd.DataFrame, cg_df: pd.DataFrame, ch_df: pd.DataFrame) -> pd.DataFrame:
+    """ch_df with the children of an import sheet replaced or added; the last row per caregiver/child wins"""
+    import_df = parse_import_dates(import_df)
+    imported_children = {}
+    # First caregiver row per name, as a dict lookup
+    key_by_name = cg_df.drop_duplicates("caregiver_name").set_index("caregiver_name")["caregiver_key"].to_dict()
+    now = datetime.utcnow().isoformat()
+    for _, row in import_df.iterrows():
+        name = str(row.get("child_name") or "").strip()
+        if not name:
+            continue
+
+        # Find the caregiver key by name
+        caregiver_name = str(row.get("caregiver_name") or "").strip()
+        caregiver_key = key_by_name.get(caregiver_name)
+
+        if caregiver_key is None:
+            st.warning(f"No caregiver found for child '{name}'. Skipping.")
+            continue
+
+        imported_children.pop((caregiver_key, name), None)
+        imported_children[(caregiver_key, name)] = {
+            "caregiver_key": caregiver_key,
+            "caregiver_name": caregiver_name,
+            "child_name": name,
+            "child_gender": str(row.get("child_gender") or "").strip(),
+            "child_phone_number": str(row.get("child_phone_number") or "").strip(),
+            "child_age": int(row.get("child_age")) if pd.notna(row.get("child_age")) else None,
+            "child_date_of_birth": row.get("child_date_of_birth").date() if pd.notna(
+                row.get("child_date_of_birth")) else None,
+            "child_education_level": str(row.get("child_education_level") or "").strip(),
+            "child_school_name": str(row.get("child_school_name") or "").strip(),
+            "child_class_level": str(row.get("child_class_level") or "").strip(),
+            "child_profession": str(row.get("child_profession") or "").strip(),
+            "last_updated": now
+        }
+
+    if not imported_children:
+        return ch_df
+    # Remove existing records for the imported children, then append them all in one concat
+    replaced = pd.MultiIndex.from_arrays([ch_df["caregiver_key"], ch_df["child_name"]]).isin(list(imported_children))
+    return pd.concat([ch_df[~replaced], _key_indexed(pd.DataFrame(list(imported_children.values())))])
+
+DATE_COLS = {"date_of_birth", "child_date_of_birth"}
+NUMERIC_COLS = {"age", "number_of_kids", "child_age"}
+# Low-cardinality text stored as category (int8 codes + small dictionary)
+CATEGORY_COLS = {"gender", "profession", "zonal_leader",
+                 "child_gender", "child_education_level", "child_class_level", "child_profession"}
+
+def _cell_text(value):
+    """Render a cell as text; whole floats (phones read from Excel) lose their '.0'"""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+def _parquet_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Give every column a single Arrow type: dates, numbers, or text"""
+    out = {}
+    for col in df.columns:
+        if col in DATE_COLS:
+            out[col] = pd.to_datetime(df[col], errors="coerce")
+        elif col in NUMERIC_COLS:
+            out[col] = _whole_numbers(df[col])
+        else:
+            out[col] = df[col].map(_cell_text)
+            if col in CATEGORY_COLS:
+                out[col] = out[col].astype("category")
+    return pd.DataFrame(out, index=df.index)
+
+def _editor_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Return df with CATEGORY_COLS as plain objects, since the editor writes back values outside the categories"""
+    return df.astype({col: object for col in CATEGORY_COLS.intersection(df.columns)})
+
+def _as_categories(df: pd.DataFrame) -> pd.DataFrame:
+    """Return df with CATEGORY_COLS stored as category dtype"""
+    converted = {col: df[col].astype("category") for col in CATEGORY_COLS.intersection(df.columns)
+                 if not isinstance(df[col].dtype, pd.CategoricalDtype)}
+    return df.assign(**converted) if converted else df
+
+def _fill_unknown(values: pd.Series) -> pd.Series:
+    """Map null and empty values to 'Unknown' in one pass, including on category columns"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Remap the codes: '' and missing go to 'Unknown', unused categories are dropped
+        categories = values.cat.categories
+        codes = values.cat.codes.to_numpy()
+        keep = np.asarray(categories != "")
+        new_categories = categories[keep]
+        if "Unknown" not in new_categories:
+            new_categories = new_categories.append(pd.Index(["Unknown"]))
+        remap = np.full(len(categories) + 1, new_categories.get_loc("Unknown"))  # last slot serves code -1
+        remap[:len(categories)][keep] = np.arange(keep.sum())
+        codes = remap[codes]
+        used = np.bincount(codes, minlength=len(new_categories)) > 0
+        codes = (np.cumsum(used) - 1)[codes]
+        return pd.Series(pd.Categorical.from_codes(codes, categories=new_categories[used]),
+                         index=values.index, name=values.name)
+    arr = values.to_numpy(dtype=object)
+    blank = pd.isna(arr) | (arr == "")
+    if not blank.any():
+        return values
+    arr = arr.copy()
+    arr[blank] = "Unknown"
+    return pd.Series(arr, index=values.index, name=values.name)
+
+def _observed(values: pd.Series) -> pd.Series:
+    """Drop categories with no rows so counts/crosstabs only show present values"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.remove_unused_categories()
+    return values
+
+@st.cache_resource(show_spinner=False)
+def store_lock():
+    """Process-wide lock for writes to the Parquet tables; cached since app.py's globals are rebuilt on every rerun"""
+    return threading.RLock()
+
+@st.cache_resource(show_spinner=False)
+def written_tables() -> dict:
+    """path -> (mtime, content fingerprint) of the last table this process wrote; outlives reruns"""
+    return {}
+
+def _write_table(df: pd.DataFrame, path: str):
+    """Write one table, skipping the rewrite when its content is unchanged since our last write"""
+    frame = _parquet_frame(df)
+    fingerprint = (tuple(frame.columns), len(frame),
+                   int(pd.util.hash_pandas_object(frame, index=False).sum()))
+    # Sessions are threads of one process: the lock keeps their writes from interleaving
+    with store_lock():
+        last = written_tables().get(path)
+        if last and os.path.exists(path) and last == (os.path.getmtime(path), fingerprint):
+            return
+        # Write-then-rename: readers never see a half-written file, and the live path always
+        # gets a fresh inode, so hard-linked backups keep the old contents
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(path) or ".")
+        os.close(fd)
+        try:
+            frame.to_parquet(tmp_path, engine="pyarrow", compression="zstd", index=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        written_tables()[path] = (os.path.getmtime(path), fingerprint)
+
+def write_tables(cg_df: pd.DataFrame, ch_df: pd.DataFrame):
+    _write_table(cg_df, CAREGIVERS_PARQUET)
+    _write_table(ch_df, CHILDREN_PARQUET)
+
+def migrate_xlsx_to_parquet():
+    """One-time conversion of the legacy Excel workbook into the Parquet tables"""
+    if os.path.exists(EXCEL_PATH):
+        # One call opens the archive once; pandas already loads it read_only/data_only.
+        # Text columns are read as str directly so phone/account numbers never pass through float.
+        text_cols = {col: str for col in CAREGIVER_COLS + CHILD_COLS
+                     if col not in DATE_COLS and col not in NUMERIC_COLS}
+        sheets = pd.read_excel(EXCEL_PATH, sheet_name=["caregivers", "children"], engine="openpyxl",
+                               dtype=text_cols)
+        cg_df = sheets["caregivers"].reindex(columns=CAREGIVER_COLS)
+        ch_df = sheets["children"].reindex(columns=CHILD_COLS)
+        logger.info(f"Migrating {EXCEL_PATH} to Parquet ({len(cg_df)} caregivers, {len(ch_df)} children)")
+    else:
         cg_df = pd.DataFrame(columns=CAREGIVER_COLS)
         ch_df = pd.DataFrame(columns=CHILD_COLS)
-        with pd.ExcelWriter(EXCEL_PATH, engine="openpyxl") as writer:
-            cg_df.to_excel(writer, index=False, sheet_name="caregivers")
-            ch_df.to_excel(writer, index=False, sheet_name="children")
+    write_tables(cg_df, ch_df)
+
+def ensure_store():
+    """Create the Parquet tables, migrating the legacy workbook only when neither exists yet"""
+    tables = {CAREGIVERS_PARQUET: CAREGIVER_COLS, CHILDREN_PARQUET: CHILD_COLS}
+    if all(os.path.exists(path) for path in tables):
+        return
+    with store_lock():
+        missing = [path for path in tables if not os.path.exists(path)]
+        if len(missing) == len(tables):
+            migrate_xlsx_to_parquet()
+            return
+        # One table survives: never overwrite it with (possibly stale) workbook data
+        for path in missing:
+            logger.warning(f"{path} is missing; creating it empty")
+            _write_table(pd.DataFrame(columns=tables[path]), path)
+
+def store_signature():
+    """Modification times of the Parquet tables; changes whenever either is rewritten"""
+    return tuple(os.path.getmtime(p) if os.path.exists(p) else 0.0
+                 for p in (CAREGIVERS_PARQUET, CHILDREN_PARQUET))
+
+def to_excel_bytes(cg_df: pd.DataFrame, ch_df: pd.DataFrame) -> bytes:
+    """Build the two-sheet workbook in memory for download"""
+    output = BytesIO()
+    # xlsxwriter streams cells without building openpyxl's document model.
+    # constant_memory is left off: pandas writes column by column, which that mode would drop.
+    engine = "xlsxwriter" if XLSXWRITER_AVAILABLE else "openpyxl"
+    with pd.ExcelWriter(output, engine=engine) as writer:
+        cg_df.to_excel(writer, index=False, sheet_name="caregivers")
+        ch_df.to_excel(writer, index=False, sheet_name="children")
+    return output.getvalue()
+
+def to_csv_bytes(df: pd.DataFrame) -> bytes:
+    """UTF-8 CSV of df without the index, written by Arrow's C++ CSV writer"""
+    # Arrow quotes every string value; the parsed contents match DataFrame.to_csv
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return df.to_csv(index=False).encode("utf-8")  # mixed-type object column
+    output = BytesIO()
+    pa_csv.write_csv(table, output)
+    return output.getvalue()
+
+def download_data(build):
+    """Pass build to st.download_button where it can run on click, otherwise build now"""
+    return build if DEFERRED_DOWNLOADS else build()
+
+@st.cache_data(show_spinner=False, max_entries=1)
+def database_excel_bytes(signature, _cg_df: pd.DataFrame, _ch_df: pd.DataFrame) -> bytes:
+    """Workbook of the stored database, rebuilt only when the tables change on disk"""
+    return to_excel_bytes(_cg_df, _ch_df)
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def analytics_counts(signature, _cg_df: pd.DataFrame, _ch_df: pd.DataFrame) -> dict:
+    """Value counts behind the analytics charts, computed once per data version"""
+    return {
+        "gender": _fill_unknown(_cg_df["gender"]).value_counts(),
+        "gender_known": _cg_df["gender"].value_counts(),
+        "profession": _fill_unknown(_cg_df["profession"]).value_counts(),
+        "profession_known": _cg_df["profession"].value_counts(),
+        "zonal_leader": _cg_df["zonal_leader"].value_counts(),
+        "child_gender": _ch_df["child_gender"].value_counts(),
+        "child_education_level": _fill_unknown(_ch_df["child_education_level"]).value_counts(),
+        "child_education_level_known": _ch_df["child_education_level"].value_counts(),
+        "child_profession": _ch_df["child_profession"].value_counts(),
+    }
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def lowered_names(signature, table: str, _df: pd.DataFrame, col: str):
+    """(codes, lowercased distinct names) for table's name column, built once per data version"""
+    codes, uniques = pd.factorize(_df[col])
+    return codes, pd.Series(uniques, dtype=object).str.lower()
+
+def name_matches(signature, table: str, _df: pd.DataFrame, col: str, search: str) -> np.ndarray:
+    """Case-insensitive literal substring match, tested once per distinct name"""
+    codes, lowered = lowered_names(signature, table, _df, col)
+    hits = lowered.str.contains(search.lower(), regex=False, na=False).to_numpy(dtype=bool)
+    return np.append(hits, False)[codes]  # code -1 (missing name) indexes the trailing False
+
+def caregiver_values(cg_df: pd.DataFrame, keys: pd.Series, col: str) -> pd.Series:
+    """cg_df[col] looked up for each caregiver key (last row wins for a duplicated key)"""
+    return keys.map(cg_df[col][~cg_df.index.duplicated(keep="last")])
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def caregiver_keys_by_name(signature, _cg_df: pd.DataFrame) -> dict:
+    """caregiver_key of the first caregiver stored under each name"""
+    return _cg_df.drop_duplicates("caregiver_name").set_index("caregiver_name")["caregiver_key"].to_dict()
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def family_counts(signature, _ch_df: pd.DataFrame) -> pd.Series:
+    """Registered children per caregiver key, counted once per data version"""
+    return _ch_df.groupby('caregiver_key', sort=False).size()
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def relationship_frame(signature, _cg_df: pd.DataFrame, _ch_df: pd.DataFrame) -> pd.DataFrame:
+    """Per-caregiver children summary for the relationships table, built once per data version"""
+    # One groupby over the children, mapped onto the caregivers
+    children_by_caregiver = _ch_df.groupby('caregiver_key', sort=False)
+    known_ages = _ch_df.loc[_ch_df['child_age'].notna(), ['caregiver_key', 'child_age']]
+    ages_by_caregiver = known_ages['child_age'].astype(str).groupby(known_ages['caregiver_key'].to_numpy())
+    caregiver_keys = _cg_df['caregiver_key']
+    number_of_children = caregiver_keys.map(children_by_caregiver.size()).fillna(0).astype(int)
+    has_children = number_of_children > 0
+    zonal_leader = _cg_df['zonal_leader'].astype(object)
+
+    return pd.DataFrame({
+        'Caregiver Name': _cg_df['caregiver_name'],
+        'Caregiver Age': _cg_df['age'].astype(str).where(_cg_df['age'].notna(), 'Unknown'),
+        'Caregiver Gender': _fill_unknown(_cg_df['gender']).str.title(),
+        'Number of Children': number_of_children,
+        'Children Names': caregiver_keys.map(children_by_caregiver['child_name'].agg(', '.join))
+                          .where(has_children, 'No children'),
+        'Children Ages': caregiver_keys.map(ages_by_caregiver.agg(', '.join)).fillna('')
+                         .where(has_children, 'N/A'),
+        # As before: only an empty string reads 'Unknown'; missing values stay blank
+        'Zonal Leader': zonal_leader.mask(zonal_leader.eq(''), 'Unknown')
+    }).reset_index(drop=True)
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def family_frame(signature, _cg_df: pd.DataFrame, _ch_df: pd.DataFrame) -> pd.DataFrame:
+    """Children of known caregivers with the caregiver columns the family charts use, built once per data version"""
+    # Fresh positional index: px.box and crosstab rebuild frames and reject duplicate labels
+    merged_family = _ch_df[_ch_df.index.isin(_cg_df.index)].reset_index(drop=True)
+    for col in ('age', 'gender', 'profession', 'zonal_leader'):
+        merged_family[col] = caregiver_values(_cg_df, merged_family['caregiver_key'], col)
+    merged_family['caregiver_age_group'] = age_groups(merged_family['age'], FAMILY_AGE_EDGES, FAMILY_AGE_LABELS)
+    return merged_family
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def family_size_frame(signature, _cg_df: pd.DataFrame, _ch_df: pd.DataFrame) -> pd.DataFrame:
+    """Children count per caregiver, including caregivers with none, built once per data version"""
+    counts = family_counts(signature, _ch_df)
+    # Caregivers with no children get a zero row; one reindex instead of a concat per caregiver
+    family_sizes = counts.reindex(counts.index.union(_cg_df.index.unique()), fill_value=0)
+    family_sizes = family_sizes.rename_axis('caregiver_key').rename('family_size').reset_index()
+    return family_sizes
+
+METRIC_CSS = """<style>
+.metric-container {
+    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+    padding: 1rem;
+    border-radius: 10px;
+    color: white;
+    text-align: center;
+    margin: 0.5rem 0;
+}
+.metric-value {
+    font-size: 2rem;
+    font-weight: bold;
+    margin: 0;
+}
+.metric-label {
+    font-size: 0.9rem;
+    opacity: 0.9;
+    margin: 0;
+}
+</style>"""
+
+METRIC_CARD = ('<div class="metric-container"><p class="metric-value">{value}</p>'
+               '<p class="metric-label">{label}</p></div>')
+
+def metric_card(value, label: str):
+    """Render one gradient metric card (styled by METRIC_CSS)"""
+    st.markdown(METRIC_CARD.format(value=value, label=label), unsafe_allow_html=True)
+
+def age_gaps(cg_df: pd.DataFrame, ch_df: pd.DataFrame) -> np.ndarray:
+    """Caregiver age minus child age for every child where both are known"""
+    gaps = (caregiver_values(cg_df, ch_df["caregiver_key"], "age") - ch_df["child_age"]).to_numpy(dtype=float, na_value=np.nan)
+    return gaps[~np.isnan(gaps)]
+
+def histogram_figure(values, bins: int, title: str, x_label: str, y_label: str, color: str):
+    """Bar chart of np.histogram counts, so only the bins go to the browser, not every row"""
+    values = pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    counts, edges = np.histogram(values[~np.isnan(values)], bins=bins)
+    fig = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges), marker_color=color))
+    fig.update_layout(title=title, xaxis_title=x_label, yaxis_title=y_label, bargap=0, showlegend=False)
+    return fig
+
+# Scatter/line traces with more points than this are downsampled before rendering
+MAX_PLOT_POINTS = 2000
+
+def _lttb_indices(x: np.ndarray, y: np.ndarray, n: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: the n point positions that best keep a line's shape"""
+    edges = np.linspace(1, len(y) - 1, n - 1).astype(int)
+    picked = np.empty(n, dtype=int)
+    picked[0], picked[-1] = 0, len(y) - 1
+    prev = 0
+    for i in range(n - 2):
+        start, stop = edges[i], edges[i + 1]
+        following = slice(stop, edges[i + 2] if i + 2 < len(edges) else len(y))
+        next_x, next_y = x[following].mean(), y[following].mean()
+        area = np.abs((x[prev] - next_x) * (y[start:stop] - y[prev])
+                      - (x[prev] - x[start:stop]) * (next_y - y[prev]))
+        prev = picked[i + 1] = start + int(area.argmax())
+    return picked
+
+def _thin_trace(trace, limit: int):
+    """Cut a scatter trace to limit points: LTTB for lines, an even stride for markers"""
+    size = len(trace.x)
+    y = pd.to_numeric(pd.Series(trace.y), errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    x = pd.to_numeric(pd.Series(trace.x), errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    if np.isnan(x).any():
+        x = np.arange(size, dtype=float)  # dates and labels: bucket by position
+    if "lines" in (trace.mode or "lines") and not np.isnan(y).any():
+        keep = _lttb_indices(x, y, limit)
+    else:
+        keep = np.linspace(0, size - 1, limit).astype(int)
+    per_point = {"x": trace.x, "y": trace.y, "customdata": trace.customdata, "text": trace.text,
+                 "hovertext": trace.hovertext, "marker.color": trace.marker.color,
+                 "marker.size": trace.marker.size}
+    trace.update({path: np.asarray(values, dtype=object)[keep] for path, values in per_point.items()
+                  if values is not None and np.ndim(values) and len(values) == size},
+                 overwrite=False)
+
+def render_plot(fig):
+    """st.plotly_chart, thinning scatter/line traces longer than MAX_PLOT_POINTS first"""
+    # Local thinning rather than plotly-resampler: its re-sampling on zoom needs a Dash
+    # callback server, which st.plotly_chart does not provide
+    for trace in fig.data:
+        if trace.type in ("scatter", "scattergl") and trace.x is not None and len(trace.x) > MAX_PLOT_POINTS:
+            _thin_trace(trace, MAX_PLOT_POINTS)
+    st.plotly_chart(fig, use_container_width=True)
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def family_figures(signature, _cg_df: pd.DataFrame, _ch_df: pd.DataFrame) -> dict:
+    """Family Structure tab figures by name (None when a chart has no data), built once per data version"""
+    cg_df, ch_df = _cg_df, _ch_df
+    fam_counts = family_counts(signature, ch_df)
+    family_df = family_frame(signature, cg_df, ch_df)
+    figs = dict.fromkeys(['family_age', 'edu_age', 'family_size', 'gender_ratio', 'age_gap', 'gender_children',
+                          'prof_edu', 'avg_child_age', 'sibling_gaps', 'edu_progress', 'zonal', 'zonal_children'])
+
+    # Children age distribution by caregiver age groups
+    if 'age' in cg_df.columns and 'child_age' in ch_df.columns:
+        fig_family_age = px.box(family_df, x='caregiver_age_group', y='child_age',
+                              title='👶 Children Age Distribution by Caregiver Age Group',
+                              color='caregiver_age_group',
+                              color_discrete_sequence=px.colors.qualitative.Set2)
+        fig_family_age.update_layout(showlegend=False)
+        figs['family_age'] = fig_family_age
+
+    # Education progression analysis
+    if 'child_education_level' in ch_df.columns and 'child_age' in ch_df.columns:
+        edu_age_data = ch_df[ch_df['child_education_level'].notna() & ch_df['child_age'].notna()]
+
+        if not edu_age_data.empty:
+            fig_edu_age = px.scatter(edu_age_data, x='child_age', y='child_education_level',
+                                   title='🎓 Education Level vs Age',
+                                   color='child_education_level',
+                                   size_max=15,
+                                   opacity=0.7,
+                                   render_mode='webgl')
+            fig_edu_age.update_yaxes(categoryorder='array',
+                                   categoryarray=list(EDU_LEVELS.categories))
+            fig_edu_age.update_layout(showlegend=False)
+            figs['edu_age'] = fig_edu_age
+
+    # Family size distribution
+    if not ch_df.empty:
+        family_sizes = family_size_frame(signature, cg_df, ch_df)
+
+        family_size_dist = family_sizes['family_size'].value_counts(sort=False).sort_index().reset_index()
+        family_size_dist.columns = ['Number of Children', 'Number of Families']
+
+        fig_family_size = px.bar(family_size_dist, x='Number of Children', y='Number of Families',
+                                title='👨‍👩‍👧‍👦 Family Size Distribution',
+                                color='Number of Families',
+                                color_continuous_scale='viridis',
+                                text='Number of Families')
+        fig_family_size.update_traces(texttemplate='%{text}', textposition='outside')
+        fig_family_size.update_layout(showlegend=False)
+        figs['family_size'] = fig_family_size
+
+    # Gender distribution across families
+    if 'child_gender' in ch_df.columns and ch_df['child_gender'].notna().any():
+        # One crosstab pass: caregivers x child gender counts (positional rows, the key index repeats)
+        family_genders = ch_df[['caregiver_key', 'child_gender']].reset_index(drop=True)
+        gender_by_family = pd.crosstab(family_genders['caregiver_key'],
+                                       _observed(family_genders['child_gender']))
+
+        if 'male' in gender_by_family.columns and 'female' in gender_by_family.columns:
+            male_children = gender_by_family['male']
+            male_ratio = male_children / (male_children + gender_by_family['female'])
+
+            figs['gender_ratio'] = histogram_figure(male_ratio, 10, '⚖️ Male-Female Ratio Distribution in Families',
+                                                    'Proportion of Male Children', 'Number of Families', '#3498db')
+
+    # Age gap analysis between caregivers and children
+    if 'age' in cg_df.columns and 'child_age' in ch_df.columns:
+        gaps = age_gaps(cg_df, ch_df)
+
+        if gaps.size:
+            fig_age_gap = histogram_figure(gaps, 20, '👥 Age Gap: Caregiver vs Children',
+                                           'Age Gap (years)', 'Frequency', '#e74c3c')
+            fig_age_gap.add_vline(x=gaps.mean(),
+                                line_dash="dash",
+                                line_color="green",
+                                annotation_text=f"Avg: {gaps.mean():.1f} years")
+            figs['age_gap'] = fig_age_gap
+
+    # Children per caregiver by gender
+    if 'gender' in cg_df.columns and not ch_df.empty:
+        caregiver_children_count = fam_counts.reset_index(name='children_count')
+
+        # Look up each caregiver's gender
+        gender_children = caregiver_children_count[caregiver_children_count['caregiver_key'].isin(cg_df.index)]
+        gender_children = gender_children.assign(
+            gender=caregiver_values(cg_df, gender_children['caregiver_key'], 'gender'))
+
+        if not gender_children.empty and gender_children['gender'].notna().any():
+            fig_gender_children = px.box(gender_children, x='gender', y='children_count',
+                                       title='👨‍👩‍👧‍👦 Children Count by Caregiver Gender',
+                                       color='gender',
+                                       color_discrete_map={'male': '#3498db', 'female': '#e91e63'})
+            fig_gender_children.update_layout(showlegend=False)
+            figs['gender_children'] = fig_gender_children
+
+    # Children education level by caregiver profession
+    if 'profession' in cg_df.columns and 'child_education_level' in ch_df.columns:
+        prof_edu_clean = family_df[
+            family_df['profession'].notna() &
+            family_df['child_education_level'].notna() &
+            (family_df['profession'] != '')
+        ]
+
+        if not prof_edu_clean.empty:
+            # Get top 5 professions
+            top_professions = prof_edu_clean['profession'].value_counts(sort=False).nlargest(5).index
+            prof_edu_filtered = prof_edu_clean[prof_edu_clean['profession'].isin(top_professions)]
+
+            # Create cross-tabulation
+            prof_edu_crosstab = pd.crosstab(_observed(prof_edu_filtered['profession']),
+                                          _observed(prof_edu_filtered['child_education_level']))
+
+            # Plain heatmap of the crosstab matrix; reversed y keeps the first profession on top
+            fig_prof_edu = go.Figure(go.Heatmap(z=prof_edu_crosstab.to_numpy(),
+                                                x=list(prof_edu_crosstab.columns),
+                                                y=list(prof_edu_crosstab.index),
+                                                colorscale='Blues',
+                                                hovertemplate='x: %{x}<br>y: %{y}<br>color: %{z}<extra></extra>'))
+            fig_prof_edu.update_layout(title='🎓 Children Education by Caregiver Profession')
+            fig_prof_edu.update_xaxes(tickangle=45)
+            fig_prof_edu.update_yaxes(tickangle=0, autorange='reversed')
+            figs['prof_edu'] = fig_prof_edu
+
+    # Average children age by caregiver age groups
+    if 'age' in cg_df.columns and 'child_age' in ch_df.columns:
+        valid_avg_data = family_df[
+            family_df['age'].notna() &
+            family_df['child_age'].notna()
+        ]
+
+        if not valid_avg_data.empty:
+            avg_child_age = valid_avg_data.groupby('caregiver_age_group')['child_age'].agg(['mean', 'std']).reset_index()
+            avg_child_age.columns = ['Caregiver Age Group', 'Average Child Age', 'Std Dev']
+
+            fig_avg_child_age = px.bar(avg_child_age, x='Caregiver Age Group', y='Average Child Age',
+                                     error_y='Std Dev',
+                                     title='📊 Average Children Age by Caregiver Age Group',
+                                     color='Average Child Age',
+                                     color_continuous_scale='plasma')
+            fig_avg_child_age.update_layout(showlegend=False)
+            figs['avg_child_age'] = fig_avg_child_age
+
+    # Sibling age gaps analysis
+    if not ch_df.empty and 'child_age' in ch_df.columns:
+        # Consecutive differences between each family's sorted known ages, in one groupby pass
+        known_child_ages = ch_df.loc[ch_df['child_age'].notna(), ['caregiver_key', 'child_age']]
+        sibling_gaps = (known_child_ages.sort_values(['caregiver_key', 'child_age'])
+                        .groupby('caregiver_key', sort=False)['child_age'].diff().dropna())
+
+        if not sibling_gaps.empty:
+            fig_sibling_gaps = histogram_figure(sibling_gaps, 15, '👫 Sibling Age Gaps Distribution',
+                                                'Age Gap (years)', 'Frequency', '#9b59b6')
+            fig_sibling_gaps.add_vline(x=sibling_gaps.mean(),
+                                     line_dash="dash",
+                                     line_color="red",
+                                     annotation_text=f"Avg: {sibling_gaps.mean():.1f} years")
+            figs['sibling_gaps'] = fig_sibling_gaps
+
+    # Education progression within families
+    if 'child_education_level' in ch_df.columns and 'child_age' in ch_df.columns:
+        # Recode onto the ordered hierarchy; levels outside it (e.g. 'Not in School') become NaN
+        edu_levels = ch_df['child_education_level'].astype("category").cat.set_categories(
+            EDU_LEVELS.categories, ordered=True)
+        ranked = edu_levels.notna().to_numpy() & ch_df['child_age'].notna().to_numpy()
+        edu_progress_data = ch_df[ranked].copy()
+
+        if not edu_progress_data.empty:
+            edu_progress_data['edu_level_numeric'] = EDU_LEVEL_VALUES[edu_levels.cat.codes.to_numpy()[ranked]]
+
+            # Expected education level for the age: 1 (Pre-primary) below 6 up to 6 (Tertiary) from 21
+            edu_progress_data['expected_edu'] = np.digitize(edu_progress_data['child_age'].to_numpy(dtype=float),
+                                                            EXPECTED_EDU_AGES) + 1
+            edu_progress_data['edu_progress'] = edu_progress_data['edu_level_numeric'] - edu_progress_data['expected_edu']
+
+            fig_edu_progress = px.scatter(edu_progress_data, x='child_age', y='edu_progress',
+                                        title='📚 Education Progress vs Expected Level',
+                                        labels={'edu_progress': 'Progress (Above/Below Expected)', 'child_age': 'Child Age'},
+                                        color='edu_progress',
+                                        color_continuous_scale='RdYlGn',
+                                        hover_data=['child_name', 'child_education_level'],
+                                        render_mode='webgl')
+            fig_edu_progress.add_hline(y=0, line_dash="dash", line_color="black",
+                                     annotation_text="Expected Level")
+            figs['edu_progress'] = fig_edu_progress
+
+    # Families per zonal leader
+    if 'zonal_leader' in cg_df.columns and cg_df['zonal_leader'].notna().any():
+        zonal_families = cg_df[cg_df['zonal_leader'].notna() & (cg_df['zonal_leader'] != '')]
+
+        if not zonal_families.empty:
+            zonal_counts = _observed(zonal_families['zonal_leader']).value_counts(sort=False).nlargest(10)
+
+            fig_zonal = px.bar(x=zonal_counts.index, y=zonal_counts.values,
+                             title='👥 Families per Zonal Leader (Top 10)',
+                             labels={'x': 'Zonal Leader', 'y': 'Number of Families'},
+                             color=zonal_counts.values,
+                             color_continuous_scale='viridis')
+            fig_zonal.update_xaxes(tickangle=45)
+            fig_zonal.update_layout(showlegend=False)
+            figs['zonal'] = fig_zonal
+
+    # Children distribution by zonal leader
+    if 'zonal_leader' in cg_df.columns and not ch_df.empty:
+        zonal_children_clean = family_df[
+            family_df['zonal_leader'].notna() &
+            (family_df['zonal_leader'] != '')
+        ]
+
+        if not zonal_children_clean.empty:
+            zonal_child_counts = _observed(zonal_children_clean['zonal_leader']).value_counts(sort=False).nlargest(10)
+
+            fig_zonal_children = px.pie(values=zonal_child_counts.values,
+                                      names=zonal_child_counts.index,
+                                      title='👶 Children Distribution by Zonal Leader')
+            fig_zonal_children.update_traces(textposition='inside', textinfo='percent+label')
+            figs['zonal_children'] = fig_zonal_children
+    return figs
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def _load_data_cached(signature):
+    """Parse the tables once per on-disk version; reruns get a cached copy"""
+    # reindex adds any missing columns and fixes the order in one allocation
+    cg_df = pd.read_parquet(CAREGIVERS_PARQUET, engine="pyarrow").reindex(columns=CAREGIVER_COLS)
+    ch_df = pd.read_parquet(CHILDREN_PARQUET, engine="pyarrow").reindex(columns=CHILD_COLS)
+    
+    # Convert date columns to proper datetime format, then to date
+    if 'date_of_birth' in cg_df.columns:
+        cg_df['date_of_birth'] = pd.to_datetime(cg_df['date_of_birth'], errors='coerce').dt.date
+    if 'child_date_of_birth' in ch_df.columns:
+        ch_df['child_date_of_birth'] = pd.to_datetime(ch_df['child_date_of_birth'], errors='coerce').dt.date
+
+    # Ages and counts as the smallest nullable ints that hold them (older files stored them as floats)
+    cg_df = cg_df.assign(age=_small_ints(cg_df['age']), number_of_kids=_small_ints(cg_df['number_of_kids']))
+    ch_df = ch_df.assign(child_age=_small_ints(ch_df['child_age']))
+        
+    # Key-indexed so per-caregiver lookups hit the index instead of scanning
+    cg_df = _key_indexed(_as_categories(cg_df))
+    ch_df = _key_indexed(_as_categories(ch_df))  # unsorted: rows keep registration order
+    return cg_df, ch_df
 
 def load_data():
+    """This session's (cg_df, ch_df), reloaded only when the tables on disk change"""
     try:
-        ensure_excel()
-        xls = pd.ExcelFile(EXCEL_PATH, engine="openpyxl")
-        cg_df = pd.read_excel(xls, sheet_name="caregivers")
-        ch_df = pd.read_excel(xls, sheet_name="children")
-        
-        # ensure columns exist
-        for col in CAREGIVER_COLS:
-            if col not in cg_df.columns:
-                cg_df[col] = None
-        for col in CHILD_COLS:
-            if col not in ch_df.columns:
-                ch_df[col] = None
-        
-        # Convert date columns to proper datetime format, then to date
-        if 'date_of_birth' in cg_df.columns:
-            cg_df['date_of_birth'] = pd.to_datetime(cg_df['date_of_birth'], errors='coerce').dt.date
-        if 'child_date_of_birth' in ch_df.columns:
-            ch_df['child_date_of_birth'] = pd.to_datetime(ch_df['child_date_of_birth'], errors='coerce').dt.date
-            
-        return cg_df[CAREGIVER_COLS], ch_df[CHILD_COLS]
+        ensure_store()
+        signature = store_signature()
+        # st.cache_data hands every rerun a fresh unpickled copy; the session keeps one
+        # until the signature moves (any save, from this session or another)
+        tables = st.session_state.get("_tables")
+        if tables is None or tables[0] != signature:
+            tables = (signature, *_load_data_cached(signature))
+            st.session_state["_tables"] = tables
+        st.session_state["_loaded_signature"] = signature
+        return tables[1], tables[2]
     except Exception as e:
         logger.error(f"Error loading data: {str(e)}")
         logger.error(traceback.format_exc())
         st.error(f"Error loading data: {str(e)}")
-        # Return empty dataframes as fallback
-        return pd.DataFrame(columns=CAREGIVER_COLS), pd.DataFrame(columns=CHILD_COLS)
+        # Return empty dataframes as fallback; None keeps them apart from any stored version
+        st.session_state["_loaded_signature"] = None
+        return _key_indexed(pd.DataFrame(columns=CAREGIVER_COLS)), _key_indexed(pd.DataFrame(columns=CHILD_COLS))
+
+def loaded_signature():
+    """Signature of the tables the last load_data() returned; keys the per-version caches"""
+    # Not store_signature(): a save landing after load_data would file these frames under a newer version
+    return st.session_state.get("_loaded_signature")
 
 def save_data(cg_df: pd.DataFrame, ch_df: pd.DataFrame):
     try:
-        with pd.ExcelWriter(EXCEL_PATH, engine="openpyxl", mode="w") as writer:
-            cg_df.to_excel(writer, index=False, sheet_name="caregivers")
-            ch_df.to_excel(writer, index=False, sheet_name="children")
+        write_tables(cg_df, ch_df)
+        _load_data_cached.clear()
     except Exception as e:
         logger.error(f"Error saving data: {str(e)}")
         logger.error(traceback.format_exc())
         st.error(f"Error saving data: {str(e)}")
 
 
-def migrate_child_phone_numbers():
-    """One-time migration to populate empty child phone numbers with caregiver phone numbers"""
-    cg_df, ch_df = load_data()
-
-    # Track changes
-    updated_count = 0
-
-    # Create a mapping of caregiver_key to phone_number
-    caregiver_phones = dict(zip(cg_df['caregiver_key'], cg_df['phone_number']))
+def migrate_child_phone_numbers(cg_df: pd.DataFrame, ch_df: pd.DataFrame) -> tuple[int, pd.DataFrame]:
+    """Populate empty child phone numbers with caregiver phone numbers; returns (count, ch_df)"""
+    ch_df = ch_df.copy()
 
-    # Update children with empty phone numbers
-    for idx, row in ch_df.iterrows():
-        child_phone = row.get('child_phone_number')
-        caregiver_key = row.get('caregiver_key')
+    # Caregiver phone per key (last row wins, as with the old dict(zip(...)))
+    phones = cg_df.drop_duplicates("caregiver_key", keep="last").set_index("caregiver_key")["phone_number"]
+    mapped = ch_df["caregiver_key"].map(phones).astype("string").str.strip()
 
-        # Check if child phone is empty/null and caregiver has a phone
-        if (pd.isna(child_phone) or str(child_phone).strip() == "") and caregiver_key in caregiver_phones:
-            caregiver_phone = caregiver_phones[caregiver_key]
-            if caregiver_phone and str(caregiver_phone).strip():
-                ch_df.at[idx, 'child_phone_number'] = str(caregiver_phone).strip()
-                updated_count += 1
-
-    if updated_count > 0:
-        # Save the updated data
-        save_data(cg_df, ch_df)
-        return updated_count
-    return 0
+    # Fill children whose phone is empty/null from a caregiver that has a phone
+    child_phone = ch_df["child_phone_number"].astype("string").str.strip()
+    fill = (child_phone.isna() | child_phone.eq("")) & mapped.notna() & mapped.ne("")
+    fill = fill.fillna(False).astype(bool)
+    ch_df.loc[fill, "child_phone_number"] = mapped[fill].to_numpy(dtype=object)
+    updated_count = int(fill.sum())
+    return updated_count, ch_df
 
 
 def backup_database():
     """Create a timestamped backup of the database."""
-    if not os.path.exists(EXCEL_PATH):
+    if not os.path.exists(CAREGIVERS_PARQUET):
         return None
 
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_dir = "backups"
-    os.makedirs(backup_dir, exist_ok=True)
-
-    backup_path = os.path.join(backup_dir, f"caregivers_database_{timestamp}.xlsx")
+    backup_path = os.path.join("backups", f"caregivers_database_{timestamp}")
     try:
-        shutil.copy2(EXCEL_PATH, backup_path)
+        os.makedirs(backup_path, exist_ok=True)
+        for table in (CAREGIVERS_PARQUET, CHILDREN_PARQUET):
+            if not os.path.exists(table):
+                continue
+            target = os.path.join(backup_path, os.path.basename(table))
+            try:
+                os.link(table, target)  # Instant; saves replace the live file, never edit it in place
+            except OSError:
+                shutil.copy2(table, target)  # Cross-device or no hard-link support
         return backup_path
     except Exception as e:
         logger.error(f"Error creating backup: {str(e)}")
@@ -192,16 +1027,30 @@ st.set_page_config(
 # Add organization header with logo
 logo_path = r"C:\Users\user\OneDrive\Desktop\ISOILAJ SDI\isoilaj logo.png"
 
+@st.cache_resource(show_spinner=False)
+def load_logo(path: str):
+    """Decode the header logo once per process; None if it is missing or PIL is unavailable"""
+    if not os.path.exists(path):
+        return None
+    try:
+        from PIL import Image  # Only needed for the logo, so imported on first use
+    except ImportError:
+        return None
+    try:
+        logo = Image.open(path)
+        logo.load()
+        return logo
+    except Exception as e:
+        logger.warning(f"Could not load logo: {str(e)}")
+        return None
+
 # Create header with logo and organization name
 header_col1, header_col2 = st.columns([1, 4])
 
 with header_col1:
-    if os.path.exists(logo_path) and PIL_AVAILABLE:
-        try:
-            logo = Image.open(logo_path)
-            st.image(logo, width=120)
-        except Exception as e:
-            st.write("🏢")  # Fallback emoji if image fails to load
+    logo = load_logo(logo_path)
+    if logo is not None:
+        st.image(logo, width=120)
     else:
         st.write("🏢")  # Fallback emoji if no PIL or image not found
 
@@ -212,7 +1061,7 @@ with header_col2:
     """)
 
 st.markdown("---")  # Add a separator line
-st.caption("Streamlit app to record caregivers and their children into a single Excel file.")
+st.caption("Streamlit app to record caregivers and their children into a local database (Excel export available).")
 
 cg_df, ch_df = load_data()
 
@@ -255,8 +1104,9 @@ with st.sidebar:
 
         if st.button("🔄 Migrate Child Phone Numbers", type="secondary"):
             with st.spinner("Migrating data..."):
-                updated_count = migrate_child_phone_numbers()
+                updated_count, migrated_ch_df = migrate_child_phone_numbers(cg_df, ch_df)
                 if updated_count > 0:
+                    save_data(cg_df, migrated_ch_df)
                     st.success(f"✅ Updated {updated_count} child phone numbers!")
                     st.rerun()  # Refresh to show updated data
                 else:
@@ -366,18 +1216,7 @@ if submitted:
         st.stop()
 
     # Validate children's phone numbers and names
-    invalid_child_phones = []
-    missing_child_names = []
-    for i, r in edited.iterrows():
-        name = str(r.get("child_name") or "").strip()
-        phone = str(r.get("child_phone_number") or "").strip()
-
-        if not name and (phone or pd.notna(r.get("child_age")) or pd.notna(r.get("child_date_of_birth")) or
-                         r.get("child_education_level") or r.get("child_profession")):
-            missing_child_names.append(f"Row {i+1}")
-
-        if phone and not validate_phone_number(phone):
-            invalid_child_phones.append(f"Row {i+1}: {name or 'Unnamed'}")
+    missing_child_names, invalid_child_phones = validate_children(edited)
 
     if missing_child_names:
         st.error(f"Child name is required in: {', '.join(missing_child_names)}")
@@ -409,55 +1248,14 @@ if submitted:
         "last_updated": now
     }
 
-    # Remove existing caregiver with same key (upsert)
-    cg_df = cg_df[cg_df["caregiver_key"] != key]
-    cg_df = pd.concat([cg_df, pd.DataFrame([new_row])], ignore_index=True)
+    # Upsert caregiver with same key
+    cg_df = upsert_caregiver(cg_df, new_row)
 
-    # Update the children row creation section (around line 350-380)
     # Prepare children rows (clean empty rows)
-    children_rows = []
-    for _, r in edited.iterrows():
-        name = str(r.get("child_name") or "").strip()
-        if not name:
-            continue
-
-        # Handle child date of birth properly
-        child_dob = r.get("child_date_of_birth")
-        if pd.notna(child_dob):
-            if isinstance(child_dob, str):
-                child_dob = pd.to_datetime(child_dob).date()
-            elif hasattr(child_dob, 'date'):
-                child_dob = child_dob.date()
-        else:
-            child_dob = None
-
-        # Get child phone number, use caregiver's phone if child's is empty
-        child_phone_raw = r.get("child_phone_number")
-        if pd.isna(child_phone_raw) or str(child_phone_raw).strip() == "":
-            child_phone = c_phone.strip()  # Use caregiver's phone number
-        else:
-            child_phone = str(child_phone_raw).strip()
-
-        child = {
-            "caregiver_key": key,
-            "caregiver_name": c_name.strip(),
-            "child_name": name,
-            "child_gender": str(r.get("child_gender") or "").strip(),
-            "child_phone_number": child_phone,
-            "child_age": int(r.get("child_age")) if pd.notna(r.get("child_age")) else None,
-            "child_date_of_birth": child_dob,
-            "child_education_level": str(r.get("child_education_level") or "").strip(),
-            "child_school_name": str(r.get("child_school_name") or "").strip(),  # New field
-            "child_class_level": str(r.get("child_class_level") or "").strip(),  # New field
-            "child_profession": str(r.get("child_profession") or "").strip(),
-            "last_updated": now
-        }
-        children_rows.append(child)
+    children_rows = build_children_frame(edited, key, c_name, c_phone, now)
 
     # Remove previous children for this caregiver to avoid duplicates, then add new set
-    ch_df = ch_df[ch_df["caregiver_key"] != key]
-    if children_rows:
-        ch_df = pd.concat([ch_df, pd.DataFrame(children_rows)], ignore_index=True)
+    ch_df = replace_children(ch_df, key, children_rows)
 
     # Save to Excel
     save_data(cg_df, ch_df)
@@ -473,10 +1271,10 @@ if submitted:
 
     if not cg_df.empty:
         # Create a searchable dropdown for existing caregivers
-        caregiver_options = {}
-        for _, row in cg_df.iterrows():
-            display_name = f"{row['caregiver_name']} - {row['phone_number'] or 'No phone'}"
-            caregiver_options[display_name] = row['caregiver_key']
+        caregiver_options = {
+            f"{r.caregiver_name} - {r.phone_number or 'No phone'}": r.caregiver_key
+            for r in cg_df.itertuples(index=False)
+        }
 
         selected_caregiver = st.selectbox(
             "Select caregiver to edit:",
@@ -486,8 +1284,8 @@ if submitted:
 
         if selected_caregiver:
             selected_key = caregiver_options[selected_caregiver]
-            caregiver_data = cg_df[cg_df['caregiver_key'] == selected_key].iloc[0]
-            children_data = ch_df[ch_df['caregiver_key'] == selected_key]
+            caregiver_data = _rows_for(cg_df, selected_key).iloc[0]
+            children_data = _rows_for(ch_df, selected_key)
 
             st.info(f"Editing: {caregiver_data['caregiver_name']}")
 
@@ -550,7 +1348,8 @@ if submitted:
                         'child_name', 'child_gender', 'child_phone_number', 'child_age',
                         'child_date_of_birth', 'child_education_level', 'child_school_name',
                         'child_class_level', 'child_profession'
-                    ]].copy()
+                    ]].reset_index(drop=True)
+                    edit_children_data = _editor_frame(edit_children_data)
 
                     # Convert date columns to proper format for display
                     if 'child_date_of_birth' in edit_children_data.columns:
@@ -574,6 +1373,7 @@ if submitted:
                     edit_children_data,
                     num_rows="dynamic",
                     use_container_width=True,
+                    height=editor_height(len(edit_children_data)),
                     hide_index=True,
                     key=f"edit_children_{selected_key}",
                     column_config={
@@ -631,49 +1431,12 @@ if submitted:
                         "last_updated": now
                     }
 
-                    # Remove old caregiver record and add updated one
-                    cg_df = cg_df[cg_df["caregiver_key"] != selected_key]
-                    cg_df = pd.concat([cg_df, pd.DataFrame([updated_caregiver])], ignore_index=True)
+                    # Overwrite the caregiver record in place
+                    cg_df = upsert_caregiver(cg_df, updated_caregiver)
 
                     # Update children data
-                    updated_children_rows = []
-                    for _, r in edited_children.iterrows():
-                        name = str(r.get("child_name") or "").strip()
-                        if not name:
-                            continue
-
-                        # Handle child date of birth properly
-                        child_dob = r.get("child_date_of_birth")
-                        if pd.notna(child_dob):
-                            if isinstance(child_dob, str):
-                                child_dob = pd.to_datetime(child_dob).date()
-                            elif hasattr(child_dob, 'date'):
-                                child_dob = child_dob.date()
-                        else:
-                            child_dob = None
-
-                        # Get child phone number, use caregiver's phone if child's is empty
-                        child_phone_raw = r.get("child_phone_number")
-                        if pd.isna(child_phone_raw) or str(child_phone_raw).strip() == "":
-                            child_phone = edit_phone.strip()
-                        else:
-                            child_phone = str(child_phone_raw).strip()
-
-                        child = {
-                            "caregiver_key": selected_key,
-                            "caregiver_name": edit_name.strip(),
-                            "child_name": name,
-                            "child_gender": str(r.get("child_gender") or "").strip(),
-                            "child_phone_number": child_phone,
-                            "child_age": int(r.get("child_age")) if pd.notna(r.get("child_age")) else None,
-                            "child_date_of_birth": child_dob,
-                            "child_education_level": str(r.get("child_education_level") or "").strip(),
-                            "child_school_name": str(r.get("child_school_name") or "").strip(),
-                            "child_class_level": str(r.get("child_class_level") or "").strip(),
-                            "child_profession": str(r.get("child_profession") or "").strip(),
-                            "last_updated": now
-                        }
-                        updated_children_rows.append(child)
+                    updated_children_rows = build_children_frame(edited_children, selected_key, edit_name,
+                                                                 edit_phone, now)
 
 
 
@@ -692,6 +1455,13 @@ with filter_col2:
     if st.button("🔄 Reset All Filters"):
         st.rerun()
 
+@st.cache_data(show_spinner=False, max_entries=16)
+def filter_options(signature, _df, col):
+    """Sorted non-blank values of col, computed once per data version"""
+    return sorted(v for v in _df[col].dropna().unique() if str(v).strip())
+
+data_signature = loaded_signature()
+
 # Advanced filters in expandable section
 with st.expander("🎛️ Advanced Filters", expanded=False):
     filter_tabs = st.tabs(["Caregiver Filters", "Children Filters"])
@@ -718,18 +1488,16 @@ with st.expander("🎛️ Advanced Filters", expanded=False):
         
         with cg_filter_col2:
             # Profession filter
-            cg_professions = cg_df['profession'].dropna().unique().tolist()
             cg_profession_filter = st.multiselect(
                 "Profession",
-                options=sorted([p for p in cg_professions if p.strip()]),
+                options=filter_options(data_signature, cg_df, 'profession'),
                 default=[]
             )
             
             # Zonal leader filter
-            cg_zonal_leaders = cg_df['zonal_leader'].dropna().unique().tolist()
             cg_zonal_filter = st.multiselect(
                 "Zonal Leader",
-                options=sorted([z for z in cg_zonal_leaders if z.strip()]),
+                options=filter_options(data_signature, cg_df, 'zonal_leader'),
                 default=[]
             )
     
@@ -755,140 +1523,104 @@ with st.expander("🎛️ Advanced Filters", expanded=False):
         
         with ch_filter_col2:
             # Education level filter
-            ch_education_levels = ch_df['child_education_level'].dropna().unique().tolist()
             ch_education_filter = st.multiselect(
                 "Education Level",
-                options=sorted([e for e in ch_education_levels if e.strip()]),
+                options=filter_options(data_signature, ch_df, 'child_education_level'),
                 default=[]
             )
             
             # Profession filter
-            ch_professions = ch_df['child_profession'].dropna().unique().tolist()
             ch_profession_filter = st.multiselect(
                 "Child Profession",
-                options=sorted([p for p in ch_professions if p.strip()]),
+                options=filter_options(data_signature, ch_df, 'child_profession'),
                 default=[]
             )
 
-# Apply filters function
-def apply_caregiver_filters(df):
-    filtered_df = df.copy()
+# Apply filters function (cached per data version and filter selection)
+@st.cache_data(max_entries=32)
+def apply_caregiver_filters(signature, _df, search, genders, ages, professions, zonals):
+    mask = np.ones(len(_df), dtype=bool)
     
     # Name search
-    if search_term:
-        filtered_df = filtered_df[filtered_df['caregiver_name'].str.contains(search_term, case=False, na=False)]
+    if search:
+        mask &= name_matches(signature, "caregivers", _df, 'caregiver_name', search)
     
     # Gender filter
-    if cg_gender_filter:
-        filtered_df = filtered_df[filtered_df['gender'].isin(cg_gender_filter)]
+    if genders:
+        mask &= isin_mask(_df['gender'], genders)
     
     # Age group filter
-    if cg_age_filter:
-        def get_age_group(age):
-            if pd.isna(age):
-                return "Unknown"
-            elif age < 18:
-                return "Under 18"
-            elif age < 30:
-                return "18-29"
-            elif age < 40:
-                return "30-39"
-            elif age < 50:
-                return "40-49"
-            elif age < 60:
-                return "50-59"
-            else:
-                return "60+"
-        
-        filtered_df['temp_age_group'] = filtered_df['age'].apply(get_age_group)
-        filtered_df = filtered_df[filtered_df['temp_age_group'].isin(cg_age_filter)]
-        filtered_df = filtered_df.drop('temp_age_group', axis=1)
+    if ages:
+        mask &= np.isin(age_groups(_df['age'], CG_AGE_EDGES, CG_AGE_LABELS), ages)
     
     # Profession filter
-    if cg_profession_filter:
-        filtered_df = filtered_df[filtered_df['profession'].isin(cg_profession_filter)]
+    if professions:
+        mask &= isin_mask(_df['profession'], professions)
     
     # Zonal leader filter
-    if cg_zonal_filter:
-        filtered_df = filtered_df[filtered_df['zonal_leader'].isin(cg_zonal_filter)]
+    if zonals:
+        mask &= isin_mask(_df['zonal_leader'], zonals)
     
-    return filtered_df
+    return _df[mask]
 
-def apply_children_filters(df):
-    filtered_df = df.copy()
+@st.cache_data(max_entries=32)
+def apply_children_filters(signature, _df, search, genders, ages, education_levels, professions):
+    mask = np.ones(len(_df), dtype=bool)
     
     # Name search
-    if search_term:
-        filtered_df = filtered_df[
-            filtered_df['child_name'].str.contains(search_term, case=False, na=False) |
-            filtered_df['caregiver_name'].str.contains(search_term, case=False, na=False)
-        ]
+    if search:
+        mask &= (name_matches(signature, "children", _df, 'child_name', search) |
+                 name_matches(signature, "children", _df, 'caregiver_name', search))
     
     # Gender filter
-    if ch_gender_filter:
-        filtered_df = filtered_df[filtered_df['child_gender'].isin(ch_gender_filter)]
+    if genders:
+        mask &= isin_mask(_df['child_gender'], genders)
     
     # Age group filter
-    if ch_age_filter:
-        def get_child_age_group(age):
-            if pd.isna(age):
-                return "Unknown"
-            elif age <= 5:
-                return "0-5"
-            elif age <= 12:
-                return "6-12"
-            elif age <= 17:
-                return "13-17"
-            elif age <= 25:
-                return "18-25"
-            else:
-                return "26+"
-        
-        filtered_df['temp_age_group'] = filtered_df['child_age'].apply(get_child_age_group)
-        filtered_df = filtered_df[filtered_df['temp_age_group'].isin(ch_age_filter)]
-        filtered_df = filtered_df.drop('temp_age_group', axis=1)
+    if ages:
+        mask &= np.isin(age_groups(_df['child_age'], CH_AGE_EDGES, CH_AGE_LABELS, right=True), ages)
     
     # Education level filter
-    if ch_education_filter:
-        filtered_df = filtered_df[filtered_df['child_education_level'].isin(ch_education_filter)]
+    if education_levels:
+        mask &= isin_mask(_df['child_education_level'], education_levels)
     
     # Profession filter
-    if ch_profession_filter:
-        filtered_df = filtered_df[filtered_df['child_profession'].isin(ch_profession_filter)]
+    if professions:
+        mask &= isin_mask(_df['child_profession'], professions)
     
-    return filtered_df
+    return _df[mask]
 
-# Apply filters
-cg_filtered = apply_caregiver_filters(cg_df)
-ch_filtered = apply_children_filters(ch_df)
+# Filter selections, one dict per table: the banner check and the cached filter calls share them
+cg_filters = {"search": search_term, "genders": tuple(cg_gender_filter), "ages": tuple(cg_age_filter),
+              "professions": tuple(cg_profession_filter), "zonals": tuple(cg_zonal_filter)}
+ch_filters = {"search": search_term, "genders": tuple(ch_gender_filter), "ages": tuple(ch_age_filter),
+              "education_levels": tuple(ch_education_filter), "professions": tuple(ch_profession_filter)}
+cg_filters_active = any(cg_filters.values())
+ch_filters_active = any(ch_filters.values())
+
+# Apply filters; with nothing selected the loaded frames are used as-is (no cache round-trip or copy)
+cg_filtered = apply_caregiver_filters(data_signature, cg_df, **cg_filters) if cg_filters_active else cg_df
+ch_filtered = apply_children_filters(data_signature, ch_df, **ch_filters) if ch_filters_active else ch_df
 
 # Display filter summary
-if any([search_term, cg_gender_filter, cg_age_filter, cg_profession_filter, cg_zonal_filter, 
-        ch_gender_filter, ch_age_filter, ch_education_filter, ch_profession_filter]):
+if cg_filters_active or ch_filters_active:
     st.info(f"📊 Showing {len(cg_filtered)} caregivers and {len(ch_filtered)} children (filtered from {len(cg_df)} caregivers and {len(ch_df)} children)")
 
 tab1, tab2, tab3, tab4, tab5 = st.tabs(["Caregivers", "Children", "Download Excel", "Analytics", "Unverified"])
 
 with tab1:
-    # Convert date columns to string for display to avoid Arrow conversion issues
-    cg_display = cg_filtered.drop(columns=["caregiver_key"]).copy()
-    if 'date_of_birth' in cg_display.columns:
-        cg_display['date_of_birth'] = cg_display['date_of_birth'].astype(str)
-    st.dataframe(cg_display, use_container_width=True)
+    # Date columns are plain dates/NaT, which Arrow converts directly; the key column is hidden
+    st.dataframe(cg_filtered, use_container_width=True, hide_index=True, column_config={"caregiver_key": None})
 with tab2:
-    # Convert date columns to string for display
-    ch_display = ch_filtered.drop(columns=["caregiver_key"]).copy()
-    if 'child_date_of_birth' in ch_display.columns:
-        ch_display['child_date_of_birth'] = ch_display['child_date_of_birth'].astype(str)
-    st.dataframe(ch_display, use_container_width=True)
+    st.dataframe(ch_filtered, use_container_width=True, hide_index=True, column_config={"caregiver_key": None})
 with tab3:
-    st.write("The Excel file contains two sheets: **caregivers** and **children** (linked internally).")
+    st.write("The Excel export contains two sheets: **caregivers** and **children** (linked internally).")
     col1, col2 = st.columns(2)
 
     with col1:
-        if os.path.exists(EXCEL_PATH):
-            with open(EXCEL_PATH, "rb") as f:
-                st.download_button("⬇️ Download caregivers_database.xlsx", f, file_name="caregivers_database.xlsx")
+        if not cg_df.empty or not ch_df.empty:
+            st.download_button("⬇️ Download caregivers_database.xlsx", database_excel_bytes(data_signature, cg_df, ch_df),
+                               file_name="caregivers_database.xlsx")
         else:
             st.info("Excel file will appear here after the first save.")
 
@@ -904,6 +1636,7 @@ with tab3:
 
 with tab4:
     st.subheader("📊 Data Analytics")
+    counts = analytics_counts(data_signature, cg_df, ch_df)
 
     if not PLOTLY_AVAILABLE:
         st.info("📊 Install plotly for enhanced analytics: `pip install plotly`")
@@ -917,7 +1650,7 @@ with tab4:
                 st.metric("Total Caregivers", len(cg_df))
 
                 if 'gender' in cg_df.columns:
-                    gender_counts = cg_df['gender'].value_counts()
+                    gender_counts = counts['gender_known']
                     st.write("**Gender Distribution:**")
                     for gender, count in gender_counts.items():
                         st.write(f"- {gender.title()}: {count}")
@@ -928,14 +1661,14 @@ with tab4:
 
                 # Profession distribution
                 if 'profession' in cg_df.columns:
-                    prof_counts = cg_df['profession'].value_counts().head(5)
+                    prof_counts = counts['profession_known'].head(5)
                     st.write("**Top 5 Professions:**")
                     for prof, count in prof_counts.items():
                         st.write(f"- {prof}: {count}")
 
                 # Zonal leader distribution
                 if 'zonal_leader' in cg_df.columns:
-                    zonal_counts = cg_df['zonal_leader'].value_counts().head(5)
+                    zonal_counts = counts['zonal_leader'].head(5)
                     st.write("**Top 5 Zonal Leaders:**")
                     for zonal, count in zonal_counts.items():
                         st.write(f"- {zonal}: {count}")
@@ -946,16 +1679,14 @@ with tab4:
                 st.metric("Total Children", len(ch_df))
 
                 if 'child_gender' in ch_df.columns:
-                    child_gender_counts = ch_df['child_gender'].value_counts()
+                    child_gender_counts = counts['child_gender']
                     st.write("**Gender Distribution:**")
                     for gender, count in child_gender_counts.items():
                         st.write(f"- {gender.title()}: {count}")
 
                 if 'child_education_level' in ch_df.columns:
                     # Include "Unknown" for missing education data
-                    edu_data = ch_df['child_education_level'].fillna('Unknown')
-                    edu_data = edu_data.replace('', 'Unknown')
-                    edu_counts = edu_data.value_counts().head(7)
+                    edu_counts = counts['child_education_level'].head(7)
                     st.write("**Education Level Distribution:**")
                     for edu, count in edu_counts.items():
                         st.write(f"- {edu}: {count}")
@@ -969,58 +1700,22 @@ with tab4:
         analytics_tabs = st.tabs(["📈 Overview", "👥 Caregivers", "👶 Children", "🔗 Relationships", "📈 Advanced Insights", "👨‍👩‍👧‍👦 Family Structure Analysis"])
 
         with analytics_tabs[0]:
-            # Add custom CSS for better styling
-            st.markdown("""
-            <style>
-            .metric-container {
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                padding: 1rem;
-                border-radius: 10px;
-                color: white;
-                text-align: center;
-                margin: 0.5rem 0;
-            }
-            .metric-value {
-                font-size: 2rem;
-                font-weight: bold;
-                margin: 0;
-            }
-            .metric-label {
-                font-size: 0.9rem;
-                opacity: 0.9;
-                margin: 0;
-            }
-            </style>
-            """, unsafe_allow_html=True)
+            # Add custom CSS for better styling (re-emitted each rerun; Streamlit drops un-rendered elements)
+            st.markdown(METRIC_CSS, unsafe_allow_html=True)
 
             # Overview metrics with enhanced styling
             st.markdown("### 📊 Key Metrics")
             col1, col2, col3, col4 = st.columns(4)
 
             with col1:
-                st.markdown(f"""
-                <div class="metric-container">
-                    <p class="metric-value">{len(cg_df)}</p>
-                    <p class="metric-label">Total Caregivers</p>
-                </div>
-                """, unsafe_allow_html=True)
+                metric_card(len(cg_df), "Total Caregivers")
 
             with col2:
-                st.markdown(f"""
-                <div class="metric-container">
-                    <p class="metric-value">{len(ch_df)}</p>
-                    <p class="metric-label">Total Children</p>
-                </div>
-                """, unsafe_allow_html=True)
+                metric_card(len(ch_df), "Total Children")
 
             with col3:
                 avg_children_per_caregiver = len(ch_df) / len(cg_df) if len(cg_df) > 0 else 0
-                st.markdown(f"""
-                <div class="metric-container">
-                    <p class="metric-value">{avg_children_per_caregiver:.1f}</p>
-                    <p class="metric-label">Avg Children/Caregiver</p>
-                </div>
-                """, unsafe_allow_html=True)
+                metric_card(f"{avg_children_per_caregiver:.1f}", "Avg Children/Caregiver")
 
             with col4:
                 if 'age' in cg_df.columns and cg_df['age'].notna().any():
@@ -1028,12 +1723,7 @@ with tab4:
                     age_display = f"{avg_caregiver_age:.1f}"
                 else:
                     age_display = "N/A"
-                st.markdown(f"""
-                <div class="metric-container">
-                    <p class="metric-value">{age_display}</p>
-                    <p class="metric-label">Avg Caregiver Age</p>
-                </div>
-                """, unsafe_allow_html=True)
+                metric_card(age_display, "Avg Caregiver Age")
 
             st.markdown("---")
 
@@ -1044,9 +1734,7 @@ with tab4:
                 with summary_col1:
                     # Caregiver gender pie chart with better colors
                     if 'gender' in cg_df.columns and cg_df['gender'].notna().any():
-                        gender_data = cg_df['gender'].fillna('Unknown')
-                        gender_data = gender_data.replace('', 'Unknown')
-                        gender_counts = gender_data.value_counts().reset_index()
+                        gender_counts = counts['gender'].reset_index()
                         gender_counts.columns = ['Gender', 'Count']
 
                         fig_gender = px.pie(
@@ -1071,9 +1759,7 @@ with tab4:
                 with summary_col2:
                     # Children education level with improved handling
                     if 'child_education_level' in ch_df.columns:
-                        edu_data = ch_df['child_education_level'].fillna('Unknown')
-                        edu_data = edu_data.replace('', 'Unknown')
-                        edu_counts = edu_data.value_counts().head(8).reset_index()
+                        edu_counts = counts['child_education_level'].head(8).reset_index()
                         edu_counts.columns = ['Education Level', 'Count']
 
                         # Custom color palette
@@ -1104,16 +1790,9 @@ with tab4:
             with caregiver_chart_col1:
                 # Age distribution histogram with better styling
                 if not cg_df.empty and cg_df['age'].notna().any():
-                    fig_age_hist = px.histogram(
-                        cg_df[cg_df['age'].notna()],
-                        x="age",
-                        title="📊 Age Distribution of Caregivers",
-                        labels={"age": "Age", "count": "Number of Caregivers"},
-                        nbins=20,
-                        color_discrete_sequence=['#2ecc71']
-                    )
+                    fig_age_hist = histogram_figure(cg_df['age'], 20, "📊 Age Distribution of Caregivers",
+                                                    "Age", "Number of Caregivers", '#2ecc71')
                     fig_age_hist.update_layout(
-                        showlegend=False,
                         title_font_size=16,
                         xaxis_title_font_size=14,
                         yaxis_title_font_size=14
@@ -1123,9 +1802,7 @@ with tab4:
 
                 # Profession distribution with improved handling
                 if 'profession' in cg_df.columns:
-                    prof_data = cg_df['profession'].fillna('Unknown')
-                    prof_data = prof_data.replace('', 'Unknown')
-                    prof_counts = prof_data.value_counts().head(10).reset_index()
+                    prof_counts = counts['profession'].head(10).reset_index()
                     prof_counts.columns = ['Profession', 'Count']
 
                     fig_prof = px.bar(
@@ -1146,35 +1823,12 @@ with tab4:
             with caregiver_chart_col2:
                 # Age group distribution with better categories
                 if not cg_df.empty and cg_df['age'].notna().any():
-                    def age_group(age):
-                        if pd.isna(age):
-                            return "Unknown"
-                        elif age < 18:
-                            return "Under 18"
-                        elif age < 30:
-                            return "18-29"
-                        elif age < 40:
-                            return "30-39"
-                        elif age < 50:
-                            return "40-49"
-                        elif age < 60:
-                            return "50-59"
-                        else:
-                            return "60+"
-
-                    cg_temp = cg_df.copy()
-                    cg_temp['age_group'] = cg_temp['age'].apply(age_group)
-                    age_group_counts = cg_temp['age_group'].value_counts().reset_index()
-                    age_group_counts.columns = ['Age Group', 'Count']
-
-                    # Sort by age group in logical order
-                    age_order = ["Under 18", "18-29", "30-39", "40-49", "50-59", "60+", "Unknown"]
-                    age_group_counts['Age Group'] = pd.Categorical(
-                        age_group_counts['Age Group'],
-                        categories=age_order,
-                        ordered=True
+                    # Count per age group, in the logical order of CG_AGE_LABELS (absent groups dropped)
+                    age_group_counts = (
+                        pd.Series(age_groups(cg_df['age'], CG_AGE_EDGES, CG_AGE_LABELS)).value_counts(sort=False)
+                        .reindex(CG_AGE_LABELS).dropna().astype(int)
+                        .rename_axis('Age Group').reset_index(name='Count')
                     )
-                    age_group_counts = age_group_counts.sort_values('Age Group')
 
                     fig_age_group = px.bar(
                         age_group_counts,
@@ -1189,7 +1843,7 @@ with tab4:
 
                 # Zonal leader distribution
                 if 'zonal_leader' in cg_df.columns and cg_df['zonal_leader'].notna().any():
-                    zonal_counts = cg_df['zonal_leader'].value_counts().head(10).reset_index()
+                    zonal_counts = counts['zonal_leader'].head(10).reset_index()
                     zonal_counts.columns = ['Zonal Leader', 'Count']
                     fig_zonal = px.bar(
                         zonal_counts,
@@ -1210,20 +1864,13 @@ with tab4:
             with children_chart_col1:
                 # Children age distribution
                 if not ch_df.empty and ch_df['child_age'].notna().any():
-                    fig_child_age = px.histogram(
-                        ch_df[ch_df['child_age'].notna()],
-                        x="child_age",
-                        title="Age Distribution of Children",
-                        labels={"child_age": "Age", "count": "Number of Children"},
-                        nbins=25,
-                        color_discrete_sequence=['#f39c12']
-                    )
-                    fig_child_age.update_layout(showlegend=False)
+                    fig_child_age = histogram_figure(ch_df['child_age'], 25, "Age Distribution of Children",
+                                                     "Age", "Number of Children", '#f39c12')
                     st.plotly_chart(fig_child_age, use_container_width=True)
 
                 # Children gender distribution
                 if 'child_gender' in ch_df.columns and ch_df['child_gender'].notna().any():
-                    child_gender_counts = ch_df['child_gender'].value_counts().reset_index()
+                    child_gender_counts = counts['child_gender'].reset_index()
                     child_gender_counts.columns = ['Gender', 'Count']
                     fig_child_gender = px.pie(
                         child_gender_counts,
@@ -1237,7 +1884,7 @@ with tab4:
             with children_chart_col2:
                 # Children education level distribution
                 if 'child_education_level' in ch_df.columns and ch_df['child_education_level'].notna().any():
-                    edu_counts = ch_df['child_education_level'].value_counts().head(8).reset_index()
+                    edu_counts = counts['child_education_level_known'].head(8).reset_index()
                     edu_counts.columns = ['Education Level', 'Count']
                     fig_edu = px.bar(
                         edu_counts,
@@ -1252,7 +1899,7 @@ with tab4:
 
                 # Children profession distribution
                 if 'child_profession' in ch_df.columns and ch_df['child_profession'].notna().any():
-                    prof_counts = ch_df['child_profession'].value_counts().head(8).reset_index()
+                    prof_counts = counts['child_profession'].head(8).reset_index()
                     prof_counts.columns = ['Profession', 'Count']
                     fig_prof = px.bar(
                         prof_counts,
@@ -1276,38 +1923,23 @@ with tab4:
 
                 with rel_col1:
                     # Caregivers with no children
-                    caregivers_with_children = ch_df['caregiver_key'].unique()
-                    caregivers_without_children = len(cg_df[~cg_df['caregiver_key'].isin(caregivers_with_children)])
+                    # Both frames are key-indexed: difference the unique key indexes, no Python sets
+                    caregivers_without_children = cg_df.index.unique().difference(ch_df.index.unique()).size
 
-                    st.markdown(f"""
-                    <div class="metric-container">
-                        <p class="metric-value">{caregivers_without_children}</p>
-                        <p class="metric-label">Caregivers with No Children</p>
-                    </div>
-                    """, unsafe_allow_html=True)
+                    metric_card(caregivers_without_children, "Caregivers with No Children")
 
                 with rel_col2:
                     # Average children per caregiver
-                    children_per_caregiver = ch_df.groupby('caregiver_key').size()
+                    children_per_caregiver = family_counts(data_signature, ch_df)
                     avg_children = children_per_caregiver.mean() if len(children_per_caregiver) > 0 else 0
 
-                    st.markdown(f"""
-                    <div class="metric-container">
-                        <p class="metric-value">{avg_children:.1f}</p>
-                        <p class="metric-label">Avg Children per Active Caregiver</p>
-                    </div>
-                    """, unsafe_allow_html=True)
+                    metric_card(f"{avg_children:.1f}", "Avg Children per Active Caregiver")
 
                 with rel_col3:
                     # Max children for one caregiver
                     max_children = children_per_caregiver.max() if len(children_per_caregiver) > 0 else 0
 
-                    st.markdown(f"""
-                    <div class="metric-container">
-                        <p class="metric-value">{max_children}</p>
-                        <p class="metric-label">Max Children per Caregiver</p>
-                    </div>
-                    """, unsafe_allow_html=True)
+                    metric_card(max_children, "Max Children per Caregiver")
 
                 st.markdown("---")
 
@@ -1317,8 +1949,10 @@ with tab4:
                 with rel_chart_col1:
                     # Distribution of children per caregiver
                     if len(children_per_caregiver) > 0:
-                        children_dist = children_per_caregiver.value_counts().sort_index().reset_index()
-                        children_dist.columns = ['Number of Children', 'Number of Caregivers']
+                        family_size_counts = np.bincount(children_per_caregiver.to_numpy())
+                        present_sizes = np.flatnonzero(family_size_counts)
+                        children_dist = pd.DataFrame({'Number of Children': present_sizes,
+                                                      'Number of Caregivers': family_size_counts[present_sizes]})
 
                         fig_children_dist = px.bar(
                             children_dist,
@@ -1337,34 +1971,13 @@ with tab4:
                 with rel_chart_col2:
                     # Age gap analysis between caregivers and their children
                     if 'age' in cg_df.columns and 'child_age' in ch_df.columns:
-                        # Merge caregiver and children data
-                        merged_data = ch_df.merge(
-                            cg_df[['caregiver_key', 'age', 'caregiver_name']],
-                            on='caregiver_key',
-                            how='left'
-                        )
-
                         # Calculate age gaps where both ages are available
-                        valid_ages = merged_data[
-                            merged_data['age'].notna() &
-                            merged_data['child_age'].notna()
-                        ].copy()
-
-                        if not valid_ages.empty:
-                            valid_ages['age_gap'] = valid_ages['age'] - valid_ages['child_age']
-
-                            fig_age_gap = px.histogram(
-                                valid_ages,
-                                x='age_gap',
-                                title="👥 Age Gap: Caregiver vs Children",
-                                labels={'age_gap': 'Age Gap (years)', 'count': 'Frequency'},
-                                nbins=20,
-                                color_discrete_sequence=['#e74c3c']
-                            )
-                            fig_age_gap.update_layout(
-                                showlegend=False,
-                                title_font_size=16
-                            )
+                        gaps = age_gaps(cg_df, ch_df)
+
+                        if gaps.size:
+                            fig_age_gap = histogram_figure(gaps, 20, "👥 Age Gap: Caregiver vs Children",
+                                                           "Age Gap (years)", "Frequency", '#e74c3c')
+                            fig_age_gap.update_layout(title_font_size=16)
                             st.plotly_chart(fig_age_gap, use_container_width=True)
 
                 st.markdown("---")
@@ -1372,22 +1985,7 @@ with tab4:
                 # Detailed relationship table
                 st.subheader("📋 Detailed Caregiver-Children Relationships")
 
-                # Create summary table
-                relationship_summary = []
-                for _, caregiver in cg_df.iterrows():
-                    caregiver_children = ch_df[ch_df['caregiver_key'] == caregiver['caregiver_key']]
-
-                    relationship_summary.append({
-                        'Caregiver Name': caregiver['caregiver_name'],
-                        'Caregiver Age': caregiver['age'] if pd.notna(caregiver['age']) else 'Unknown',
-                        'Caregiver Gender': caregiver['gender'].title() if caregiver['gender'] else 'Unknown',
-                        'Number of Children': len(caregiver_children),
-                        'Children Names': ', '.join(caregiver_children['child_name'].tolist()) if len(caregiver_children) > 0 else 'No children',
-                        'Children Ages': ', '.join([str(age) for age in caregiver_children['child_age'].dropna().tolist()]) if len(caregiver_children) > 0 else 'N/A',
-                        'Zonal Leader': caregiver['zonal_leader'] if caregiver['zonal_leader'] else 'Unknown'
-                    })
-
-                relationship_df = pd.DataFrame(relationship_summary)
+                relationship_df = relationship_frame(data_signature, cg_df, ch_df)
 
                 # Add filters for the relationship table
                 rel_filter_col1, rel_filter_col2 = st.columns(2)
@@ -1408,7 +2006,7 @@ with tab4:
 
                 # Export relationship data
                 if st.button("📤 Export Relationship Summary"):
-                    csv = filtered_relationships.to_csv(index=False).encode('utf-8')
+                    csv = to_csv_bytes(filtered_relationships)
                     st.download_button(
                         "⬇️ Download Relationship Summary CSV",
                         csv,
@@ -1431,7 +2029,7 @@ with tab4:
 
                     if len(children_per_caregiver) > 0:
                         most_children = children_per_caregiver.max()
-                        caregiver_with_most = cg_df[cg_df['caregiver_key'] == children_per_caregiver.idxmax()]['caregiver_name'].iloc[0]
+                        caregiver_with_most = _rows_for(cg_df, children_per_caregiver.idxmax())['caregiver_name'].iloc[0]
                         st.write(f"• {caregiver_with_most} has the most children ({most_children})")
 
                 with insights_col2:
@@ -1455,13 +2053,10 @@ with analytics_tabs[4]:  # Add a new "📈 Advanced Insights" tab
     if 'last_updated' in cg_df.columns:
         st.markdown("##### 📅 Registration Trends Over Time")
 
-        # Convert last_updated to datetime
-        cg_df_temp = cg_df.copy()
-        cg_df_temp['registration_date'] = pd.to_datetime(cg_df_temp['last_updated']).dt.date
-
-        # Daily registrations
-        daily_reg = cg_df_temp.groupby('registration_date').size().reset_index()
-        daily_reg.columns = ['Date', 'New Registrations']
+        # Daily registrations: floor the timestamps to midnight and count, staying datetime64
+        registered = pd.to_datetime(cg_df['last_updated'])
+        daily_reg = (registered.dt.floor('D').value_counts(sort=False).sort_index()
+                     .rename_axis('Date').reset_index(name='New Registrations'))
 
         # Cumulative registrations
         daily_reg['Cumulative Registrations'] = daily_reg['New Registrations'].cumsum()
@@ -1471,12 +2066,12 @@ with analytics_tabs[4]:  # Add a new "📈 Advanced Insights" tab
         with trend_col1:
             fig_daily = px.line(daily_reg, x='Date', y='New Registrations',
                                title='📊 Daily Registration Trends')
-            st.plotly_chart(fig_daily, use_container_width=True)
+            render_plot(fig_daily)
 
         with trend_col2:
             fig_cumulative = px.line(daily_reg, x='Date', y='Cumulative Registrations',
                                    title='📈 Cumulative Registrations')
-            st.plotly_chart(fig_cumulative, use_container_width=True)
+            render_plot(fig_cumulative)
 
     st.markdown("---")
 
@@ -1492,22 +2087,16 @@ with tab5:
     if 'address' in cg_df.columns and cg_df['address'].notna().any():
         st.markdown("### 🗺️ Geographic Distribution")
 
-        # Extract cities/areas from addresses (simple keyword extraction)
-        addresses = cg_df['address'].dropna().str.lower()
-
-        # Common Nigerian cities/areas for pattern matching
-        cities = ['lagos', 'abuja', 'kano', 'ibadan', 'port harcourt', 'benin', 'kaduna',
-                 'jos', 'ilorin', 'aba', 'onitsha', 'warri', 'calabar', 'uyo', 'enugu', 'Isolo', 'Ilasamaja']
+        # Extract cities/areas from addresses: lowercased once, then one literal substring
+        # test per city, so overlapping names ('aba' in 'calabar') each count
+        addresses = cg_df['address'].dropna().astype(str).str.lower()
+        city_counts = pd.Series({city: int(addresses.str.contains(city, regex=False).sum())
+                                 for city in CITIES})
+        city_counts = city_counts[city_counts > 0]
 
-        city_counts = {}
-        for city in cities:
-            count = addresses.str.contains(city, na=False).sum()
-            if count > 0:
-                city_counts[city.title()] = count
-
-        if city_counts:
-            city_df = pd.DataFrame(list(city_counts.items()), columns=['City', 'Count'])
-            city_df = city_df.sort_values('Count', ascending=False).head(10)
+        if not city_counts.empty:
+            city_df = pd.DataFrame({'City': city_counts.index.str.title(), 'Count': city_counts.to_numpy()})
+            city_df = city_df.nlargest(10, 'Count')
 
             fig_cities = px.bar(city_df, x='City', y='Count',
                               title='🏙️ Top Cities by Caregiver Count',
@@ -1523,46 +2112,22 @@ with tab5:
 with analytics_tabs[5]:  # Family Structure Analysis tab
             st.subheader("👨‍👩‍👧‍👦 Family Structure Analysis")
 
+            # Every chart in this tab is built once per data version; reruns reuse the figures
+            family_figs = family_figures(data_signature, cg_df, ch_df)
+            # Children per caregiver, shared with the insights below
+            fam_counts = family_counts(data_signature, ch_df)
+
             family_col1, family_col2 = st.columns(2)
 
             with family_col1:
                 # Children age distribution by caregiver age groups
-                if 'age' in cg_df.columns and 'child_age' in ch_df.columns:
-                    merged_family = ch_df.merge(cg_df[['caregiver_key', 'age']], on='caregiver_key')
-
-                    # Create caregiver age groups
-                    def caregiver_age_group(age):
-                        if pd.isna(age): return "Unknown"
-                        elif age < 30: return "Under 30"
-                        elif age < 40: return "30-39"
-                        elif age < 50: return "40-49"
-                        else: return "50+"
-
-                    merged_family['caregiver_age_group'] = merged_family['age'].apply(caregiver_age_group)
-
-                    fig_family_age = px.box(merged_family, x='caregiver_age_group', y='child_age',
-                                          title='👶 Children Age Distribution by Caregiver Age Group',
-                                          color='caregiver_age_group',
-                                          color_discrete_sequence=px.colors.qualitative.Set2)
-                    fig_family_age.update_layout(showlegend=False)
-                    st.plotly_chart(fig_family_age, use_container_width=True)
+                if family_figs['family_age'] is not None:
+                    render_plot(family_figs['family_age'])
 
             with family_col2:
                 # Education progression analysis
-                if 'child_education_level' in ch_df.columns and 'child_age' in ch_df.columns:
-                    edu_age_data = ch_df[ch_df['child_education_level'].notna() & ch_df['child_age'].notna()]
-
-                    if not edu_age_data.empty:
-                        fig_edu_age = px.scatter(edu_age_data, x='child_age', y='child_education_level',
-                                               title='🎓 Education Level vs Age',
-                                               color='child_education_level',
-                                               size_max=15,
-                                               opacity=0.7)
-                        fig_edu_age.update_yaxes(categoryorder='array',
-                                               categoryarray=['Pre-primary', 'Primary', 'Junior Secondary',
-                                                            'O\'Level', 'Senior Secondary', 'Tertiary'])
-                        fig_edu_age.update_layout(showlegend=False)
-                        st.plotly_chart(fig_edu_age, use_container_width=True)
+                if family_figs['edu_age'] is not None:
+                    render_plot(family_figs['edu_age'])
 
             # Add these new family structure charts:
             st.markdown("#### 📊 Additional Family Insights")
@@ -1571,50 +2136,13 @@ with analytics_tabs[5]:  # Family Structure Analysis tab
 
             with family_row2_col1:
                 # Family size distribution
-                if not ch_df.empty:
-                    family_sizes = ch_df.groupby('caregiver_key').size().reset_index()
-                    family_sizes.columns = ['caregiver_key', 'family_size']
-
-                    # Add caregivers with no children
-                    caregivers_with_children = set(ch_df['caregiver_key'].unique())
-                    all_caregivers = set(cg_df['caregiver_key'].unique())
-                    caregivers_no_children = all_caregivers - caregivers_with_children
-
-                    # Add zero-child families
-                    for caregiver_key in caregivers_no_children:
-                        family_sizes = pd.concat([family_sizes, pd.DataFrame([{
-                            'caregiver_key': caregiver_key,
-                            'family_size': 0
-                        }])], ignore_index=True)
-
-                    family_size_dist = family_sizes['family_size'].value_counts().sort_index().reset_index()
-                    family_size_dist.columns = ['Number of Children', 'Number of Families']
-
-                    fig_family_size = px.bar(family_size_dist, x='Number of Children', y='Number of Families',
-                                            title='👨‍👩‍👧‍👦 Family Size Distribution',
-                                            color='Number of Families',
-                                            color_continuous_scale='viridis',
-                                            text='Number of Families')
-                    fig_family_size.update_traces(texttemplate='%{text}', textposition='outside')
-                    fig_family_size.update_layout(showlegend=False)
-                    st.plotly_chart(fig_family_size, use_container_width=True)
+                if family_figs['family_size'] is not None:
+                    render_plot(family_figs['family_size'])
 
             with family_row2_col2:
                 # Gender distribution across families
-                if 'child_gender' in ch_df.columns and ch_df['child_gender'].notna().any():
-                    gender_by_family = ch_df.groupby('caregiver_key')['child_gender'].value_counts().unstack(fill_value=0)
-
-                    if 'male' in gender_by_family.columns and 'female' in gender_by_family.columns:
-                        gender_by_family['total'] = gender_by_family['male'] + gender_by_family['female']
-                        gender_by_family['male_ratio'] = gender_by_family['male'] / gender_by_family['total']
-
-                        fig_gender_ratio = px.histogram(gender_by_family, x='male_ratio',
-                                                      title='⚖️ Male-Female Ratio Distribution in Families',
-                                                      labels={'male_ratio': 'Proportion of Male Children', 'count': 'Number of Families'},
-                                                      nbins=10,
-                                                      color_discrete_sequence=['#3498db'])
-                        fig_gender_ratio.update_layout(showlegend=False)
-                        st.plotly_chart(fig_gender_ratio, use_container_width=True)
+                if family_figs['gender_ratio'] is not None:
+                    render_plot(family_figs['gender_ratio'])
 
             # Add third row of family insights
             st.markdown("#### 🔍 Detailed Family Patterns")
@@ -1623,47 +2151,13 @@ with analytics_tabs[5]:  # Family Structure Analysis tab
 
             with family_row3_col1:
                 # Age gap analysis between caregivers and children
-                if 'age' in cg_df.columns and 'child_age' in ch_df.columns:
-                    merged_age_data = ch_df.merge(cg_df[['caregiver_key', 'age']], on='caregiver_key')
-                    valid_ages = merged_age_data[
-                        merged_age_data['age'].notna() &
-                        merged_age_data['child_age'].notna()
-                    ].copy()
-
-                    if not valid_ages.empty:
-                        valid_ages['age_gap'] = valid_ages['age'] - valid_ages['child_age']
-
-                        fig_age_gap = px.histogram(valid_ages, x='age_gap',
-                                                 title='👥 Age Gap: Caregiver vs Children',
-                                                 labels={'age_gap': 'Age Gap (years)', 'count': 'Frequency'},
-                                                 nbins=20,
-                                                 color_discrete_sequence=['#e74c3c'])
-                        fig_age_gap.add_vline(x=valid_ages['age_gap'].mean(),
-                                            line_dash="dash",
-                                            line_color="green",
-                                            annotation_text=f"Avg: {valid_ages['age_gap'].mean():.1f} years")
-                        fig_age_gap.update_layout(showlegend=False)
-                        st.plotly_chart(fig_age_gap, use_container_width=True)
+                if family_figs['age_gap'] is not None:
+                    render_plot(family_figs['age_gap'])
 
             with family_row3_col2:
                 # Children per caregiver by gender
-                if 'gender' in cg_df.columns and not ch_df.empty:
-                    caregiver_children_count = ch_df.groupby('caregiver_key').size().reset_index()
-                    caregiver_children_count.columns = ['caregiver_key', 'children_count']
-
-                    # Merge with caregiver gender
-                    gender_children = caregiver_children_count.merge(
-                        cg_df[['caregiver_key', 'gender']],
-                        on='caregiver_key'
-                    )
-
-                    if not gender_children.empty and gender_children['gender'].notna().any():
-                        fig_gender_children = px.box(gender_children, x='gender', y='children_count',
-                                                   title='👨‍👩‍👧‍👦 Children Count by Caregiver Gender',
-                                                   color='gender',
-                                                   color_discrete_map={'male': '#3498db', 'female': '#e91e63'})
-                        fig_gender_children.update_layout(showlegend=False)
-                        st.plotly_chart(fig_gender_children, use_container_width=True)
+                if family_figs['gender_children'] is not None:
+                    render_plot(family_figs['gender_children'])
 
             # Continue with all other family analysis sections...
             # (Add the remaining sections with proper indentation)
@@ -1675,55 +2169,13 @@ family_row4_col1, family_row4_col2 = st.columns(2)
 
 with family_row4_col1:
     # Children education level by caregiver profession
-    if 'profession' in cg_df.columns and 'child_education_level' in ch_df.columns:
-        prof_edu_data = ch_df.merge(cg_df[['caregiver_key', 'profession']], on='caregiver_key')
-        prof_edu_clean = prof_edu_data[
-            prof_edu_data['profession'].notna() &
-            prof_edu_data['child_education_level'].notna() &
-            (prof_edu_data['profession'] != '')
-        ]
-
-        if not prof_edu_clean.empty:
-            # Get top 5 professions
-            top_professions = prof_edu_clean['profession'].value_counts().head(5).index
-            prof_edu_filtered = prof_edu_clean[prof_edu_clean['profession'].isin(top_professions)]
-
-            # Create cross-tabulation
-            prof_edu_crosstab = pd.crosstab(prof_edu_filtered['profession'],
-                                          prof_edu_filtered['child_education_level'])
-
-            fig_prof_edu = px.imshow(prof_edu_crosstab.values,
-                                   x=prof_edu_crosstab.columns,
-                                   y=prof_edu_crosstab.index,
-                                   title='🎓 Children Education by Caregiver Profession',
-                                   color_continuous_scale='Blues',
-                                   aspect='auto')
-            fig_prof_edu.update_xaxes(tickangle=45)
-            fig_prof_edu.update_yaxes(tickangle=0)
-            st.plotly_chart(fig_prof_edu, use_container_width=True)
+    if family_figs['prof_edu'] is not None:
+        render_plot(family_figs['prof_edu'])
 
 with family_row4_col2:
     # Average children age by caregiver age groups
-    if 'age' in cg_df.columns and 'child_age' in ch_df.columns:
-        merged_avg_data = ch_df.merge(cg_df[['caregiver_key', 'age']], on='caregiver_key')
-        valid_avg_data = merged_avg_data[
-            merged_avg_data['age'].notna() &
-            merged_avg_data['child_age'].notna()
-        ].copy()
-
-        if not valid_avg_data.empty:
-            valid_avg_data['caregiver_age_group'] = valid_avg_data['age'].apply(caregiver_age_group)
-
-            avg_child_age = valid_avg_data.groupby('caregiver_age_group')['child_age'].agg(['mean', 'std']).reset_index()
-            avg_child_age.columns = ['Caregiver Age Group', 'Average Child Age', 'Std Dev']
-
-            fig_avg_child_age = px.bar(avg_child_age, x='Caregiver Age Group', y='Average Child Age',
-                                     error_y='Std Dev',
-                                     title='📊 Average Children Age by Caregiver Age Group',
-                                     color='Average Child Age',
-                                                                 color_continuous_scale='plasma')
-            fig_avg_child_age.update_layout(showlegend=False)
-            st.plotly_chart(fig_avg_child_age, use_container_width=True)
+    if family_figs['avg_child_age'] is not None:
+        render_plot(family_figs['avg_child_age'])
 
 # Add fifth row for advanced family analytics
 st.markdown("#### 🔬 Advanced Family Analytics")
@@ -1732,77 +2184,13 @@ family_row5_col1, family_row5_col2 = st.columns(2)
 
 with family_row5_col1:
     # Sibling age gaps analysis
-    if not ch_df.empty and 'child_age' in ch_df.columns:
-        # Find families with multiple children
-        multi_child_families = ch_df.groupby('caregiver_key').filter(lambda x: len(x) > 1)
-
-        if not multi_child_families.empty:
-            age_gaps = []
-            for caregiver_key in multi_child_families['caregiver_key'].unique():
-                family_children = multi_child_families[
-                    (multi_child_families['caregiver_key'] == caregiver_key) &
-                    (multi_child_families['child_age'].notna())
-                ]['child_age'].sort_values()
-
-                if len(family_children) > 1:
-                    for i in range(len(family_children) - 1):
-                        gap = family_children.iloc[i+1] - family_children.iloc[i]
-                        age_gaps.append(gap)
-
-            if age_gaps:
-                age_gaps_df = pd.DataFrame({'age_gap': age_gaps})
-                fig_sibling_gaps = px.histogram(age_gaps_df, x='age_gap',
-                                              title='👫 Sibling Age Gaps Distribution',
-                                              labels={'age_gap': 'Age Gap (years)', 'count': 'Frequency'},
-                                              nbins=15,
-                                              color_discrete_sequence=['#9b59b6'])
-                fig_sibling_gaps.add_vline(x=pd.Series(age_gaps).mean(),
-                                         line_dash="dash",
-                                         line_color="red",
-                                         annotation_text=f"Avg: {pd.Series(age_gaps).mean():.1f} years")
-                fig_sibling_gaps.update_layout(showlegend=False)
-                st.plotly_chart(fig_sibling_gaps, use_container_width=True)
+    if family_figs['sibling_gaps'] is not None:
+        render_plot(family_figs['sibling_gaps'])
 
 with family_row5_col2:
     # Education progression within families
-    if 'child_education_level' in ch_df.columns and 'child_age' in ch_df.columns:
-        # Create education level hierarchy
-        edu_hierarchy = {
-            'Pre-primary': 1, 'Primary': 2, 'Junior Secondary': 3,
-            'O\'Level': 4, 'Senior Secondary': 5, 'Tertiary': 6,
-            'Vocational': 5.5, 'Graduate': 7
-        }
-
-        edu_progress_data = ch_df[
-            ch_df['child_education_level'].notna() &
-            ch_df['child_age'].notna() &
-            ch_df['child_education_level'].isin(edu_hierarchy.keys())
-        ].copy()
-
-        if not edu_progress_data.empty:
-            edu_progress_data['edu_level_numeric'] = edu_progress_data['child_education_level'].map(edu_hierarchy)
-
-            # Calculate expected education level based on age
-            def expected_education(age):
-                if age < 6: return 1  # Pre-primary
-                elif age < 12: return 2  # Primary
-                elif age < 15: return 3  # Junior Secondary
-                elif age < 18: return 4  # O'Level
-                elif age < 21: return 5  # Senior Secondary
-                else: return 6  # Tertiary
-
-            edu_progress_data['expected_edu'] = edu_progress_data['child_age'].apply(expected_education)
-            edu_progress_data['edu_progress'] = edu_progress_data['edu_level_numeric'] - edu_progress_data['expected_edu']
-
-            fig_edu_progress = px.scatter(edu_progress_data, x='child_age', y='edu_progress',
-                                        title='📚 Education Progress vs Expected Level',
-                                        labels={'edu_progress': 'Progress (Above/Below Expected)', 'child_age': 'Child Age'},
-                                        color='edu_progress',
-                                        color_continuous_scale='RdYlGn',
-                                        hover_data=['child_name', 'child_education_level'])
-            fig_edu_progress.add_hline(y=0, line_dash="dash", line_color="black",
-                                     annotation_text="Expected Level")
-            st.plotly_chart(fig_edu_progress, use_container_width=True)
+    if family_figs['edu_progress'] is not None:
+        render_plot(family_figs['edu_progress'])
 
 # Add sixth row for zonal leader analysis
 st.markdown("#### 🌍 Zonal Leadership Analysis")
@@ -1811,38 +2199,13 @@ family_row6_col1, family_row6_col2 = st.columns(2)
 
 with family_row6_col1:
     # Families per zonal leader
-    if 'zonal_leader' in cg_df.columns and cg_df['zonal_leader'].notna().any():
-        zonal_families = cg_df[cg_df['zonal_leader'].notna() & (cg_df['zonal_leader'] != '')]
-
-        if not zonal_families.empty:
-            zonal_counts = zonal_families['zonal_leader'].value_counts().head(10)
-
-            fig_zonal = px.bar(x=zonal_counts.index, y=zonal_counts.values,
-                             title='👥 Families per Zonal Leader (Top 10)',
-                             labels={'x': 'Zonal Leader', 'y': 'Number of Families'},
-                             color=zonal_counts.values,
-                             color_continuous_scale='viridis')
-            fig_zonal.update_xaxes(tickangle=45)
-            fig_zonal.update_layout(showlegend=False)
-            st.plotly_chart(fig_zonal, use_container_width=True)
+    if family_figs['zonal'] is not None:
+        render_plot(family_figs['zonal'])
 
 with family_row6_col2:
     # Children distribution by zonal leader
-    if 'zonal_leader' in cg_df.columns and not ch_df.empty:
-        zonal_children = ch_df.merge(cg_df[['caregiver_key', 'zonal_leader']], on='caregiver_key')
-        zonal_children_clean = zonal_children[
-            zonal_children['zonal_leader'].notna() &
-            (zonal_children['zonal_leader'] != '')
-        ]
-
-        if not zonal_children_clean.empty:
-            zonal_child_counts = zonal_children_clean['zonal_leader'].value_counts().head(10)
-
-            fig_zonal_children = px.pie(values=zonal_child_counts.values,
-                                      names=zonal_child_counts.index,
-                                      title='👶 Children Distribution by Zonal Leader')
-            fig_zonal_children.update_traces(textposition='inside', textinfo='percent+label')
-            st.plotly_chart(fig_zonal_children, use_container_width=True)
+    if family_figs['zonal_children'] is not None:
+        render_plot(family_figs['zonal_children'])
 
 # Add summary insights section
 st.markdown("#### 💡 Family Structure Insights")
@@ -1852,10 +2215,10 @@ insights_col1, insights_col2, insights_col3 = st.columns(3)
 with insights_col1:
     st.markdown("**👨‍👩‍👧‍👦 Family Composition**")
     if not ch_df.empty:
-        avg_family_size = ch_df.groupby('caregiver_key').size().mean()
+        avg_family_size = fam_counts.mean()
         st.metric("Average Family Size", f"{avg_family_size:.1f} children")
 
-        largest_family = ch_df.groupby('caregiver_key').size().max()
+        largest_family = fam_counts.max()
         st.metric("Largest Family", f"{largest_family} children")
 
 with insights_col2:
@@ -1892,9 +2255,7 @@ with rec_col1:
     st.markdown("**📈 Growth Opportunities**")
 
     # Calculate families without children
-    caregivers_with_children = set(ch_df['caregiver_key'].unique()) if not ch_df.empty else set()
-    all_caregivers = set(cg_df['caregiver_key'].unique())
-    families_without_children = len(all_caregivers - caregivers_with_children)
+    families_without_children = cg_df.index.unique().difference(ch_df.index.unique()).size
 
     if families_without_children > 0:
         st.write(f"• Follow up with {families_without_children} caregivers to register their children")
@@ -1913,8 +2274,7 @@ with rec_col2:
 
     # Identify large families that might need more support
     if not ch_df.empty:
-        large_families = ch_df.groupby('caregiver_key').size()
-        very_large_families = large_families[large_families >= 5]
+        very_large_families = fam_counts[fam_counts >= 5]
         if len(very_large_families) > 0:
             st.write(f"• {len(very_large_families)} families have 5+ children - consider additional support")
 
@@ -1948,8 +2308,9 @@ with edit_tab1:
     )
 
     if selected_caregiver:
-        caregiver_data = cg_df[cg_df["caregiver_name"] == selected_caregiver].iloc[0]
-        caregiver_key = caregiver_data["caregiver_key"]
+        # Cached name -> key map and a key-index lookup, instead of scanning every name per rerun
+        caregiver_key = caregiver_keys_by_name(data_signature, cg_df)[selected_caregiver]
+        caregiver_data = _rows_for(cg_df, caregiver_key).iloc[0]
 
         with st.form("edit_caregiver_form"):
             st.write(f"Editing: {selected_caregiver}")
@@ -1988,7 +2349,7 @@ with edit_tab1:
             edit_numkids = st.number_input("Number of Kids", min_value=0, step=1, value=kids_value)
 
             # Get children for this caregiver
-            caregiver_children = ch_df[ch_df["caregiver_key"] == caregiver_key].copy()
+            caregiver_children = _rows_for(ch_df, caregiver_key).reset_index(drop=True)
 
             st.markdown("---")
             st.subheader("Children")
@@ -2002,6 +2363,7 @@ with edit_tab1:
                         ["child_name", "child_gender", "child_phone_number", "child_age",
                          "child_date_of_birth", "child_education_level", "child_school_name", "child_class_level",
                          "child_profession"]].copy()
+                    children_edit_data = _editor_frame(children_edit_data)
 
                     # Convert date to datetime for the editor
                     if "child_date_of_birth" in children_edit_data.columns:
@@ -2009,20 +2371,13 @@ with edit_tab1:
                             children_edit_data["child_date_of_birth"])
 
                     # Convert NaN values to empty strings for text columns and ensure proper data types
-                    children_edit_data["child_school_name"] = children_edit_data["child_school_name"].fillna("").astype(
-                        str)
-                    children_edit_data["child_class_level"] = children_edit_data["child_class_level"].fillna("").astype(
-                        str)
-                    children_edit_data["child_profession"] = children_edit_data["child_profession"].fillna("").astype(
-                        str)
-                    children_edit_data["child_gender"] = children_edit_data["child_gender"].fillna("").astype(str)
-                    children_edit_data["child_phone_number"] = children_edit_data["child_phone_number"].fillna(
-                        "").astype(str)
+                    children_edit_data[EDITOR_TEXT_COLS] = children_edit_data[EDITOR_TEXT_COLS].fillna("").astype(str)
 
                     edited_children = st.data_editor(
                         children_edit_data,
                         num_rows="dynamic",
                         use_container_width=True,
+                        height=editor_height(len(children_edit_data)),
                         hide_index=True,
                         key=f"edit_children_{caregiver_key}",
                         column_config={
@@ -2068,11 +2423,7 @@ with edit_tab1:
                     }])
 
                     # Ensure proper data types for the template
-                    child_template["child_school_name"] = child_template["child_school_name"].astype(str)
-                    child_template["child_class_level"] = child_template["child_class_level"].astype(str)
-                    child_template["child_profession"] = child_template["child_profession"].astype(str)
-                    child_template["child_gender"] = child_template["child_gender"].astype(str)
-                    child_template["child_phone_number"] = child_template["child_phone_number"].astype(str)
+                    child_template[EDITOR_TEXT_COLS] = child_template[EDITOR_TEXT_COLS].astype(str)
 
                     edited_children = st.data_editor(
                         child_template,
@@ -2117,11 +2468,7 @@ with edit_tab1:
                     st.stop()
 
                 # Validate children's phone numbers
-                invalid_child_phones = []
-                for i, r in edited_children.iterrows():
-                    phone = str(r.get("child_phone_number") or "").strip()
-                    if phone and not validate_phone_number(phone):
-                        invalid_child_phones.append(f"Row {i+1}: {r.get('child_name')}")
+                _, invalid_child_phones = validate_children(edited_children)
 
                 if invalid_child_phones:
                     st.error(f"Invalid phone number format for: {', '.join(invalid_child_phones)}")
@@ -2133,13 +2480,8 @@ with edit_tab1:
                 # Check if name or phone changed - if so, generate new key
                 if edit_name != caregiver_data["caregiver_name"] or edit_phone != caregiver_data["phone_number"]:
                     new_key = stable_key(edit_name, edit_phone)
-                    # Remove old records
-                    cg_df = cg_df[cg_df["caregiver_key"] != caregiver_key]
-                    ch_df = ch_df[ch_df["caregiver_key"] != caregiver_key]
                 else:
                     new_key = caregiver_key
-                    # Remove old caregiver record but keep the key
-                    cg_df = cg_df[cg_df["caregiver_key"] != new_key]
 
                 # Create updated caregiver record
                 updated_caregiver = {
@@ -2158,45 +2500,24 @@ with edit_tab1:
                     "last_updated": now
                 }
 
-                # Add updated caregiver
-                cg_df = pd.concat([cg_df, pd.DataFrame([updated_caregiver])], ignore_index=True)
-
-                # Process children
-                children_rows = []
-                for _, r in edited_children.iterrows():
-                    name = str(r.get("child_name") or "").strip()
-                    if not name:
-                        continue
-
-                    # Get the child phone number from the row data
-                    child_phone = str(r.get("child_phone_number") or "").strip()
+                # Overwrite the caregiver record (under its old key) in place
+                cg_df = upsert_caregiver(cg_df, updated_caregiver, old_key=caregiver_key)
 
-                    child = {
-                        "caregiver_key": new_key,
-                        "caregiver_name": edit_name.strip(),
-                        "child_name": name,
-                        "child_gender": str(r.get("child_gender") or "").strip(),
-                        "child_phone_number": child_phone,
-                        "child_age": int(r.get("child_age")) if pd.notna(r.get("child_age")) else None,
-                        "child_date_of_birth": pd.to_datetime(r.get("child_date_of_birth")).date() if pd.notna(r.get("child_date_of_birth")) else None,
-                        "child_education_level": str(r.get("child_education_level") or "").strip(),
-                        "child_school_name": str(r.get("child_school_name") or "").strip(),
-                        "child_class_level": str(r.get("child_class_level") or "").strip(),
-                        "child_profession": str(r.get("child_profession") or "").strip(),
-                        "last_updated": now
-                    }
-                    children_rows.append(child)
+                # Process children (no caregiver phone fallback when editing)
+                children_rows = build_children_frame(edited_children, new_key, edit_name, None, now)
 
-                # Add updated children
-                if children_rows:
-                    ch_df = pd.concat([ch_df, pd.DataFrame(children_rows)], ignore_index=True)
+                # Replace this caregiver's children with the edited set
+                ch_df = replace_children(ch_df, caregiver_key, children_rows)
 
                 # Save to Excel
                 save_data(cg_df, ch_df)
                 st.success(f"Updated caregiver '{edit_name}' and {len(children_rows)} child(ren).")
                 st.rerun()  # Refresh the app
 
-with edit_tab2:
+@fragment
+def delete_section():
+    """Delete picker and confirmation; picking a caregiver reruns only this section"""
+    cg_df, ch_df = load_data()  # current tables, not the ones from the last full run
     st.write("⚠️ Danger Zone: Delete Records")
     delete_caregiver = st.selectbox(
         "Select caregiver to delete",
@@ -2205,32 +2526,39 @@ with edit_tab2:
     )
 
     if delete_caregiver:
-        caregiver_key = cg_df[cg_df["caregiver_name"] == delete_caregiver]["caregiver_key"].iloc[0]
-        child_count = len(ch_df[ch_df["caregiver_key"] == caregiver_key])
+        signature = loaded_signature()
+        caregiver_key = caregiver_keys_by_name(signature, cg_df)[delete_caregiver]
+        child_count = int(family_counts(signature, ch_df).get(caregiver_key, 0))
 
         st.warning(f"This will delete {delete_caregiver} and {child_count} associated children records.")
 
         if st.button("🗑️ Confirm Delete", key="delete_confirm"):
             # Remove the caregiver and their children
-            cg_df = cg_df[cg_df["caregiver_key"] != caregiver_key]
-            ch_df = ch_df[ch_df["caregiver_key"] != caregiver_key]
+            cg_df = cg_df.drop(index=caregiver_key, errors="ignore")
+            ch_df = ch_df.drop(index=caregiver_key, errors="ignore")
             save_data(cg_df, ch_df)
             st.success(f"Deleted {delete_caregiver} and {child_count} children records.")
             st.rerun()  # Refresh the app
 
+with edit_tab2:
+    delete_section()
+
 # Add a new tab or section for import/export
 st.markdown("### 📤 Import/Export Data")
 import_export_tab1, import_export_tab2 = st.tabs(["Export Data", "Import Data"])
 
-with import_export_tab1:
+@fragment
+def export_section(cg_filtered: pd.DataFrame, ch_filtered: pd.DataFrame, search_active: bool):
+    """Export format picker and downloads; files are serialized only when downloaded"""
+    cg_df, ch_df = load_data()
     st.write("Export data in different formats")
 
     # Add option to export filtered data
     export_filtered = st.checkbox("Export only filtered data", value=False)
 
     # Use the appropriate dataframes based on the filter choice
-    export_cg = cg_filtered if export_filtered and search_term else cg_df
-    export_ch = ch_filtered if export_filtered and search_term else ch_df
+    export_cg = cg_filtered if export_filtered and search_active else cg_df
+    export_ch = ch_filtered if export_filtered and search_active else ch_df
 
     export_format = st.selectbox(
         "Select export format",
@@ -2239,38 +2567,39 @@ with import_export_tab1:
 
     if export_format == "Excel":
         # Create Excel in memory
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine="openpyxl") as writer:
-            export_cg.to_excel(writer, index=False, sheet_name="caregivers")
-            export_ch.to_excel(writer, index=False, sheet_name="children")
-
-        output.seek(0)
         file_name = "filtered_caregivers_database.xlsx" if export_filtered else "caregivers_database.xlsx"
-        st.download_button("⬇️ Download Excel", output, file_name=file_name)
+        st.download_button("⬇️ Download Excel", download_data(lambda: to_excel_bytes(export_cg, export_ch)),
+                           file_name=file_name)
     elif export_format == "CSV":
         # Export as CSV
-        csv_cg = export_cg.to_csv(index=False).encode('utf-8')
-        csv_ch = export_ch.to_csv(index=False).encode('utf-8')
         col1, col2 = st.columns(2)
         with col1:
             file_name = "filtered_caregivers.csv" if export_filtered else "caregivers.csv"
-            st.download_button("⬇️ Download Caregivers CSV", csv_cg, file_name=file_name)
+            st.download_button("⬇️ Download Caregivers CSV", download_data(lambda: to_csv_bytes(export_cg)),
+                               file_name=file_name)
         with col2:
             file_name = "filtered_children.csv" if export_filtered else "children.csv"
-            st.download_button("⬇️ Download Children CSV", csv_ch, file_name=file_name)
+            st.download_button("⬇️ Download Children CSV", download_data(lambda: to_csv_bytes(export_ch)),
+                               file_name=file_name)
     elif export_format == "JSON":
         # Export as JSON
-        json_cg = export_cg.to_json(orient="records").encode('utf-8')
-        json_ch = export_ch.to_json(orient="records").encode('utf-8')
         col1, col2 = st.columns(2)
         with col1:
             file_name = "filtered_caregivers.json" if export_filtered else "caregivers.json"
-            st.download_button("⬇️ Download", json_cg, file_name=file_name)
+            st.download_button("⬇️ Download", download_data(lambda: export_cg.to_json(orient="records").encode('utf-8')),
+                               file_name=file_name)
         with col2:
             file_name = "filtered_children.json" if export_filtered else "children.json"
-            st.download_button("⬇️ Download", json_ch, file_name=file_name)
+            st.download_button("⬇️ Download", download_data(lambda: export_ch.to_json(orient="records").encode('utf-8')),
+                               file_name=file_name)
 
-with import_export_tab2:
+with import_export_tab1:
+    export_section(cg_filtered, ch_filtered, bool(search_term))
+
+@fragment
+def import_section():
+    """Upload, preview and confirm an import; these widgets rerun only this section"""
+    cg_df, ch_df = load_data()  # current tables, so back-to-back imports build on each other
     st.write("Import data from CSV or Excel")
     uploaded_file = st.file_uploader("Choose a file", type=["xlsx", "csv"])
 
@@ -2278,188 +2607,48 @@ with import_export_tab2:
         try:
             if uploaded_file.name.endswith('.csv'):
                 # Handle CSV import
-                import_df = pd.read_csv(uploaded_file)
-                st.write("Preview of imported data:")
-                st.dataframe(import_df.head())
-
-                # Determine if this is caregivers or children data
-                is_caregiver_data = "caregiver_name" in import_df.columns and "caregiver_key" not in import_df.columns
-                is_child_data = "child_name" in import_df.columns
-
-                if st.button("Confirm Import"):
-                    if is_caregiver_data:
-                        # Process caregiver data
-                        for _, row in import_df.iterrows():
-                            name = str(row.get("caregiver_name") or "").strip()
-                            phone = str(row.get("phone_number") or "").strip()
-
-                            if not name:
-                                continue
-
-                            key = stable_key(name, phone)
-                            now = datetime.utcnow().isoformat()
-
-                            new_row = {
-                                "caregiver_key": key,
-                                "caregiver_name": name,
-                                "gender": str(row.get("gender") or "").strip(),
-                                "profession": str(row.get("profession") or "").strip(),
-                                "date_of_birth": pd.to_datetime(row.get("date_of_birth"), errors='coerce').date() if pd.notna(row.get("date_of_birth")) else None,
-                                "age": int(row.get("age")) if pd.notna(row.get("age")) else None,
-                                "phone_number": phone,
-                                "address": str(row.get("address") or "").strip(),  # Add this line
-                                "zonal_leader": str(row.get("zonal_leader") or "").strip(),  # Add this new field
-                                "bank": str(row.get("bank") or "").strip(),  # Add this new field
-                                "account_number": str(row.get("account_number") or "").strip(),  # Add this new field
-                                "number_of_kids": int(row.get("number_of_kids")) if pd.notna(row.get("number_of_kids")) else None,
-                                "last_updated": now
-                            }
-
-                            # Remove existing caregiver with same key (upsert)
-                            cg_df = cg_df[cg_df["caregiver_key"] != key]
-                            cg_df = pd.concat([cg_df, pd.DataFrame([new_row])], ignore_index=True)
-
-                        save_data(cg_df, ch_df)
-                        st.success("Caregiver data imported successfully!")
-
-                    elif is_child_data:
-                        # Process children data
-                        for _, row in import_df.iterrows():
-                            name = str(row.get("child_name") or "").strip()
-                            if not name:
-                                continue
-
-                            # Find the caregiver key by name
-                            caregiver_name = str(row.get("caregiver_name") or "").strip()
-                            caregiver_row = cg_df[cg_df["caregiver_name"] == caregiver_name]
-
-                            if caregiver_row.empty:
-                                st.warning(f"No caregiver found for child '{name}'. Skipping.")
-                                continue
-
-                            caregiver_key = caregiver_row.iloc[0]["caregiver_key"]
-
-                            # Get the child phone number from the row data
-                            child_phone = str(row.get("child_phone_number") or "").strip()
-
-                            now = datetime.utcnow().isoformat()
-
-                            new_child = {
-                                "caregiver_key": caregiver_key,
-                                "caregiver_name": caregiver_name,
-                                "child_name": name,
-                                "child_gender": str(row.get("child_gender") or "").strip(),
-                                "child_phone_number": child_phone,
-                                "child_age": int(row.get("child_age")) if pd.notna(row.get("child_age")) else None,
-                                "child_date_of_birth": pd.to_datetime(
-                                    row.get("child_date_of_birth")).date() if pd.notna(
-                                    row.get("child_date_of_birth")) else None,
-                                "child_education_level": str(row.get("child_education_level") or "").strip(),
-                                "child_school_name": str(row.get("child_school_name") or "").strip(),
-                                "child_class_level": str(row.get("child_class_level") or "").strip(),
-                                "child_profession": str(row.get("child_profession") or "").strip(),
-                                "last_updated": now
-                            }
-
-                            # Remove existing child record for this child
-                            ch_df = ch_df[~((ch_df["caregiver_key"] == caregiver_key) & (ch_df["child_name"] == name))]
-                            ch_df = pd.concat([ch_df, pd.DataFrame([new_child])], ignore_index=True)
-
-                        save_data(cg_df, ch_df)
-                        st.success("Children data imported successfully!")
-                    else:
-                        st.error("Unknown data format. Please ensure the CSV has either caregiver or child columns.")
+                sources = {uploaded_file.name: pd.read_csv(uploaded_file)}
             else:
-                # Handle Excel import
+                # Handle Excel import: every selected sheet comes from one parse of the workbook
                 import_xl = pd.ExcelFile(uploaded_file)
                 sheet_names = import_xl.sheet_names
-                selected_sheet = st.selectbox("Select sheet to import", options=sheet_names)
-                import_df = pd.read_excel(import_xl, sheet_name=selected_sheet)
-                st.write("Preview of imported data:")
+                selected_sheets = st.multiselect("Select sheets to import", options=sheet_names,
+                                                 default=sheet_names[:1])
+                sources = pd.read_excel(import_xl, sheet_name=selected_sheets)
+            st.write("Preview of imported data:")
+            for source, import_df in sources.items():
+                if len(sources) > 1:
+                    st.caption(source)
                 st.dataframe(import_df.head())
 
-                # Determine if this is caregivers or children data
-                is_caregiver_data = "caregiver_name" in import_df.columns and "caregiver_key" not in import_df.columns
-                is_child_data = "child_name" in import_df.columns
-
-                if st.button("Confirm Import"):
-                    if is_caregiver_data:
-                        # Process caregiver data
-                        for _, row in import_df.iterrows():
-                            name = str(row.get("caregiver_name") or "").strip()
-                            phone = str(row.get("phone_number") or "").strip()
-
-                            if not name:
-                                continue
-
-                            key = stable_key(name, phone)
-                            now = datetime.utcnow().isoformat()
-
-                            new_row = {
-                                "caregiver_key": key,
-                                "caregiver_name": name,
-                                "gender": str(row.get("gender") or "").strip(),
-                                "profession": str(row.get("profession") or "").strip(),
-                                "date_of_birth": pd.to_datetime(row.get("date_of_birth"), errors='coerce').date() if pd.notna(row.get("date_of_birth")) else None,
-                                "age": int(row.get("age")) if pd.notna(row.get("age")) else None,
-                                "phone_number": phone,
-                                "address": str(row.get("address") or "").strip(),
-                                "zonal_leader": str(row.get("zonal_leader") or "").strip(),
-                                "bank": str(row.get("bank") or "").strip(),
-                                "account_number": str(row.get("account_number") or "").strip(),
-                                "number_of_kids": int(row.get("number_of_kids")) if pd.notna(row.get("number_of_kids")) else None,
-                                "last_updated": now
-                            }
-                            
-                            # Remove existing caregiver with same key (upsert)
-                            cg_df = cg_df[cg_df["caregiver_key"] != key]
-                            cg_df = pd.concat([cg_df, pd.DataFrame([new_row])], ignore_index=True)
-                        
-                        save_data(cg_df, ch_df)
-                        st.success("Caregiver data imported successfully!")
-                    elif is_child_data:
-                        # Process children data
-                        for _, row in import_df.iterrows():
-                            name = str(row.get("child_name") or "").strip()
-                            if not name:
-                                continue
-                                
-                            # Find the caregiver key by name
-                            caregiver_name = str(row.get("caregiver_name") or "").strip()
-                            caregiver_row = cg_df[cg_df["caregiver_name"] == caregiver_name]
-                            
-                            if caregiver_row.empty:
-                                st.warning(f"No caregiver found for child '{name}'. Skipping.")
-                                continue
-                                
-                            caregiver_key = caregiver_row.iloc[0]["caregiver_key"]
-                            
-                            now = datetime.utcnow().isoformat()
-                            
-                            new_child = {
-                                "caregiver_key": caregiver_key,
-                                "caregiver_name": caregiver_name,
-                                "child_name": name,
-                                "child_gender": str(row.get("child_gender") or "").strip(),  # Add this new field
-                                "child_phone_number": child_phone,
-                                "child_age": int(row.get("child_age")) if pd.notna(row.get("child_age")) else None,
-                                "child_date_of_birth": pd.to_datetime(row.get("child_date_of_birth")).date() if pd.notna(row.get("child_date_of_birth")) else None,
-                                "child_education_level": str(row.get("child_education_level") or "").strip(),
-                                "child_profession": str(row.get("child_profession") or "").strip(),
-                                "last_updated": now
-                            }
-                            
-                            # Remove existing child record for this child
-                            ch_df = ch_df[~((ch_df["caregiver_key"] == caregiver_key) & (ch_df["child_name"] == name))]
-                            ch_df = pd.concat([ch_df, pd.DataFrame([new_child])], ignore_index=True)
-                        
-                        save_data(cg_df, ch_df)
-                        st.success("Children data imported successfully!")
-                    else:
-                        st.error("Unknown data format. Please ensure the Excel sheet has either caregiver or child columns.")
+            # Determine if each source is caregivers or children data
+            kinds = {source: "caregivers" if "caregiver_name" in df.columns and "caregiver_key" not in df.columns
+                     else "children" if "child_name" in df.columns else None
+                     for source, df in sources.items()}
+
+            if st.button("Confirm Import"):
+                # Caregivers first, so children in the same workbook can link to them
+                for source, import_df in sources.items():
+                    if kinds[source] == "caregivers":
+                        cg_df = _import_caregivers(import_df, cg_df)
+                for source, import_df in sources.items():
+                    if kinds[source] == "children":
+                        ch_df = _import_children(import_df, cg_df, ch_df)
+                imported = set(kinds.values())
+                if imported - {None}:
+                    save_data(cg_df, ch_df)
+                if "caregivers" in imported:
+                    st.success("Caregiver data imported successfully!")
+                if "children" in imported:
+                    st.success("Children data imported successfully!")
+                for source in (source for source, kind in kinds.items() if kind is None):
+                    st.error(f"Unknown data format in {source}. Please ensure it has either caregiver or child columns.")
         except Exception as e:
             st.error(f"Error importing file: {str(e)}")
 
+with import_export_tab2:
+    import_section()
+
 
 # Add footer with app information
 st.markdown("---")
@@ -4,6 +4,9 @@ import streamlit as st
 from datetime import datetime
 
 class CaregiverForm:
+    GENDER_OPTIONS = ("", "male", "female")
+    _GENDER_INDEX = {"male": 1, "female": 2}
+
     def __init__(self, form_key: str = "new"):
         self.form_key = form_key
     
@@ -21,7 +24,7 @@ class CaregiverForm:
                 
                 gender = st.selectbox(
                     "Gender", 
-                    options=["", "male", "female"],
+                    options=self.GENDER_OPTIONS,
                     index=self._get_gender_index(initial_data.get("gender") if initial_data else "")
                 )
                 
@@ -76,8 +79,7 @@ class CaregiverForm:
     
     def _get_gender_index(self, gender_value: str):
         """Get index for gender selection box"""
-        gender_map = {"male": 1, "female": 2}
-        return gender_map.get(gender_value, 0)
+        return self._GENDER_INDEX.get(gender_value, 0)
     
     def _calculate_age(self, dob):
         """Calculate age from date of birth"""
@@ -1,7 +1,12 @@
 
 import streamlit as st
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
 import os
+import threading
 from datetime import datetime
 from hashlib import sha1
 import logging
@@ -9,7 +14,21 @@ import logging
 # Set up logging
 logger = logging.getLogger(__name__)
 
-UNVERIFIED_EXCEL_PATH = "unverified_caregivers.xlsx"
+try:
+    from filelock import FileLock
+    FILELOCK_AVAILABLE = True
+except ImportError:
+    FILELOCK_AVAILABLE = False
+
+try:
+    import python_calamine  # noqa: F401
+    # pandas only has the calamine engine from 2.2
+    CALAMINE_AVAILABLE = tuple(int(part) for part in pd.__version__.split(".")[:2]) >= (2, 2)
+except ImportError:
+    CALAMINE_AVAILABLE = False
+
+UNVERIFIED_PARQUET = "unverified_caregivers.parquet"
+UNVERIFIED_EXCEL_PATH = "unverified_caregivers.xlsx"  # legacy store, migrated once
 
 UNVERIFIED_COLS = [
     "unverified_id",
@@ -21,52 +40,181 @@ UNVERIFIED_COLS = [
     "verified_by"
 ]
 
+UNVERIFIED_SCHEMA = pa.schema([(col, pa.string()) for col in UNVERIFIED_COLS])
+
+# Serializes writes to the store: across server processes with filelock, otherwise across this server's sessions
+_STORE_LOCK = FileLock(f"{UNVERIFIED_PARQUET}.lock") if FILELOCK_AVAILABLE else threading.Lock()
+
+PENDING_PAGE_SIZE = 25  # pending caregivers shown per page in the Verify tab
+
+STATUSES = ["pending", "verified", "rejected"]
+VERIFIERS = ["Manual Verification", "Bulk Action"]
+
+_TAB_LABELS = ("📤 Upload Names", "📝 Manage List", "✅ Verify & Add")
+
+# Manage tab editor columns; built once at import rather than on every rerun
+_UNVERIFIED_COLUMN_CONFIG = {
+    "unverified_id": st.column_config.TextColumn("ID", disabled=True, width="small"),
+    "name": st.column_config.TextColumn("Name", width="medium"),
+    "status": st.column_config.SelectboxColumn(
+        "Status",
+        options=STATUSES,
+        width="small"
+    ),
+    "upload_date": st.column_config.DatetimeColumn("Upload Date", disabled=True, width="medium"),
+    "notes": st.column_config.TextColumn("Notes", width="large"),
+    "verified_date": st.column_config.DatetimeColumn("Verified Date", disabled=True, width="medium"),
+    "verified_by": st.column_config.TextColumn("Verified By", disabled=True, width="medium"),
+    "_name_lower": None  # search helper column, hidden
+}
+
 def generate_unverified_id(name: str) -> str:
     """Generate a unique ID for unverified caregiver"""
     timestamp = datetime.now().isoformat()
     raw = f"{name.strip().lower()}|{timestamp}"
     return sha1(raw.encode("utf-8")).hexdigest()[:12]
 
-def ensure_unverified_excel():
-    """Create unverified caregivers Excel file if it doesn't exist"""
-    if not os.path.exists(UNVERIFIED_EXCEL_PATH):
-        df = pd.DataFrame(columns=UNVERIFIED_COLS)
-        with pd.ExcelWriter(UNVERIFIED_EXCEL_PATH, engine="openpyxl") as writer:
-            df.to_excel(writer, index=False, sheet_name="unverified_caregivers")
+def generate_unverified_ids(names) -> list[str]:
+    """generate_unverified_id for a batch, sharing one timestamp; the position keeps equal names apart"""
+    stamp = datetime.now().isoformat()
+    return [sha1(f"{name.strip().lower()}|{stamp}|{i}".encode("utf-8")).hexdigest()[:12]
+            for i, name in enumerate(names)]
+
+def _parquet_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Every unverified column as text: str values, None for blanks"""
+    return pd.DataFrame({col: df[col].map(lambda v: None if pd.isna(v) else str(v)).astype(object)
+                         for col in UNVERIFIED_COLS})
+
+def _arrow_table(df: pd.DataFrame) -> pa.Table:
+    """The list as an Arrow table with UNVERIFIED_SCHEMA"""
+    return pa.Table.from_pandas(_parquet_frame(df), schema=UNVERIFIED_SCHEMA, preserve_index=False)
+
+def _write_unverified(table: pa.Table):
+    """Write the list to Parquet via a temp file, so readers never see a partial write"""
+    tmp_path = f"{UNVERIFIED_PARQUET}.tmp"
+    pq.write_table(table, tmp_path, compression="zstd")
+    os.replace(tmp_path, UNVERIFIED_PARQUET)
+
+def ensure_unverified_store():
+    """Create the unverified Parquet file, converting the legacy Excel file if there is one"""
+    if os.path.exists(UNVERIFIED_PARQUET):
+        return
+    with _STORE_LOCK:
+        if os.path.exists(UNVERIFIED_PARQUET):  # another session created it while we waited
+            return
+        if os.path.exists(UNVERIFIED_EXCEL_PATH):
+            df = pd.read_excel(UNVERIFIED_EXCEL_PATH, sheet_name="unverified_caregivers", dtype=str)
+            df = df.reindex(columns=UNVERIFIED_COLS)
+            logger.info(f"Migrating {UNVERIFIED_EXCEL_PATH} to Parquet ({len(df)} records)")
+        else:
+            df = pd.DataFrame(columns=UNVERIFIED_COLS)
+        _write_unverified(_arrow_table(df))
+
+def _with_categories(values: pd.Series, known: list) -> pd.Series:
+    """values as category dtype whose categories start with known (in order), then any other values seen"""
+    extra = sorted(set(values.dropna().unique()) - set(known))
+    return values.astype(pd.CategoricalDtype(known + extra))
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def _load_unverified_cached(mtime: float) -> pd.DataFrame:
+    """Parse the list once per on-disk version; reruns get a cached copy"""
+    # reindex adds any missing columns and fixes the order
+    df = pd.read_parquet(UNVERIFIED_PARQUET, engine="pyarrow").reindex(columns=UNVERIFIED_COLS)
+    # Arrow-backed names keep the name search in Arrow's string kernels (pandas 2 would load object)
+    df["name"] = df["name"].astype(pd.StringDtype("pyarrow"))
+    # Lowercased once per file version for the dedup check and the search; never saved
+    df["_name_lower"] = df["name"].str.lower()
+    # Few distinct values: int8 codes make the status filters and counts cheap
+    df["status"] = _with_categories(df["status"], STATUSES)
+    df["verified_by"] = _with_categories(df["verified_by"], VERIFIERS)
+    return df
 
 def load_unverified_data():
     """Load unverified caregivers data"""
     try:
-        ensure_unverified_excel()
-        df = pd.read_excel(UNVERIFIED_EXCEL_PATH, sheet_name="unverified_caregivers")
-        
-        # Ensure all columns exist
-        for col in UNVERIFIED_COLS:
-            if col not in df.columns:
-                df[col] = None
-                
-        return df[UNVERIFIED_COLS]
+        ensure_unverified_store()
+        return _load_unverified_cached(os.path.getmtime(UNVERIFIED_PARQUET))
     except Exception as e:
         logger.error(f"Error loading unverified data: {str(e)}")
         st.error(f"Error loading unverified data: {str(e)}")
-        return pd.DataFrame(columns=UNVERIFIED_COLS)
+        return pd.DataFrame(columns=UNVERIFIED_COLS + ["_name_lower"])
 
-def save_unverified_data(df: pd.DataFrame):
-    """Save unverified caregivers data"""
+def save_unverified_data(changes=(), deleted_ids=()):
+    """Write changes (frames of unverified_id plus the columns they set) and deletions into the saved list"""
     try:
-        with pd.ExcelWriter(UNVERIFIED_EXCEL_PATH, engine="openpyxl", mode="w") as writer:
-            df.to_excel(writer, index=False, sheet_name="unverified_caregivers")
+        ensure_unverified_store()
+        # Re-read and write under one lock, so records another session added or changed since
+        # this page was rendered are kept; only the cells this session changed are replaced
+        with _STORE_LOCK:
+            stored = pd.read_parquet(UNVERIFIED_PARQUET, engine="pyarrow").reindex(columns=UNVERIFIED_COLS)
+            for change in changes:
+                stored = merge_edits(stored, change)
+            if len(deleted_ids):
+                stored = stored[~stored["unverified_id"].isin(deleted_ids)]
+            _write_unverified(_arrow_table(stored))
+        _load_unverified_cached.clear()
+        _unverified_stats_cached.clear()
     except Exception as e:
         logger.error(f"Error saving unverified data: {str(e)}")
         st.error(f"Error saving unverified data: {str(e)}")
 
+def status_changes(ids, status: str, verified_by: str) -> list[pd.DataFrame]:
+    """Changes for save_unverified_data setting ids to status, all stamped with the same time"""
+    return [pd.DataFrame({"unverified_id": list(ids), "status": status,
+                          "verified_date": datetime.now().isoformat(), "verified_by": verified_by})]
+
+def editor_changes(shown_df: pd.DataFrame, edited_rows: dict) -> list[pd.DataFrame]:
+    """Changes for save_unverified_data from st.data_editor's edited_rows (row position -> {column: value})"""
+    # Rows that set the same columns share one frame, so untouched cells are never written
+    by_cols = {}
+    for pos, values in edited_rows.items():
+        cols = tuple(col for col in UNVERIFIED_COLS if col in values)
+        if cols:
+            row = {"unverified_id": shown_df["unverified_id"].iat[int(pos)], **{col: values[col] for col in cols}}
+            by_cols.setdefault(cols, []).append(row)
+    return [pd.DataFrame(rows) for rows in by_cols.values()]
+
+def append_unverified_data(new_df: pd.DataFrame):
+    """Add records to the saved list; the stored rows are concatenated as Arrow chunks, not rebuilt in pandas"""
+    try:
+        ensure_unverified_store()
+        new_table = _arrow_table(new_df)
+        # Read and write under one lock so a concurrent save cannot be lost between them
+        with _STORE_LOCK:
+            stored = pq.read_table(UNVERIFIED_PARQUET).select(UNVERIFIED_COLS).cast(UNVERIFIED_SCHEMA)
+            _write_unverified(pa.concat_tables([stored, new_table]))
+        _load_unverified_cached.clear()
+        _unverified_stats_cached.clear()
+    except Exception as e:
+        logger.error(f"Error saving unverified data: {str(e)}")
+        st.error(f"Error saving unverified data: {str(e)}")
+
+def merge_edits(unverified_df: pd.DataFrame, edited_df: pd.DataFrame) -> pd.DataFrame:
+    """unverified_df with each edited row's columns written over the first record sharing its unverified_id"""
+    first = unverified_df.drop_duplicates("unverified_id")
+    pos = pd.Index(first["unverified_id"]).get_indexer(edited_df["unverified_id"])
+    found = pos >= 0
+    cols = [col for col in UNVERIFIED_COLS if col in edited_df.columns]
+    merged = unverified_df.astype(object)  # edited cells may come back as timestamps or None
+    merged.loc[first.index[pos[found]], cols] = edited_df.loc[found, cols].to_numpy()
+    return merged
+
 def process_uploaded_file(uploaded_file):
     """Process uploaded CSV or Excel file"""
     try:
         if uploaded_file.name.endswith('.csv'):
-            df = pd.read_csv(uploaded_file)
+            try:
+                # Arrow's multithreaded reader keeps columns Arrow-backed (no object inference);
+                # blank and NA cells become nulls, as with pd.read_csv
+                convert = pa_csv.ConvertOptions(strings_can_be_null=True)
+                df = pa_csv.read_csv(uploaded_file, convert_options=convert).to_pandas(types_mapper=pd.ArrowDtype)
+            except pa.ArrowInvalid:
+                uploaded_file.seek(0)
+                df = pd.read_csv(uploaded_file)  # pandas tolerates what Arrow rejects (e.g. non-UTF-8 text)
         elif uploaded_file.name.endswith(('.xlsx', '.xls')):
-            df = pd.read_excel(uploaded_file)
+            # calamine (Rust) reads .xlsx and .xls several times faster; pandas' own openpyxl
+            # path already opens the workbook read_only/data_only, so it needs no engine_kwargs
+            df = pd.read_excel(uploaded_file, engine="calamine" if CALAMINE_AVAILABLE else None)
         else:
             st.error("Please upload a CSV or Excel file")
             return None
@@ -86,7 +234,7 @@ def render_unverified_caregivers_section():
     unverified_df = load_unverified_data()
     
     # Create tabs for different functions
-    upload_tab, manage_tab, verify_tab = st.tabs(["📤 Upload Names", "📝 Manage List", "✅ Verify & Add"])
+    upload_tab, manage_tab, verify_tab = st.tabs(_TAB_LABELS)
     
     with upload_tab:
         st.subheader("📤 Upload Unverified Caregivers")
@@ -122,8 +270,11 @@ def render_unverified_caregivers_section():
                     
                     # Show first 10 names as preview
                     preview_names = names_preview[:10]
-                    for i, name in enumerate(preview_names, 1):
-                        st.write(f"{i}. {name}")
+                    st.dataframe(
+                        pd.DataFrame({"#": range(1, len(preview_names) + 1), "name": preview_names}),
+                        use_container_width=True,
+                        hide_index=True
+                    )
                     
                     if len(names_preview) > 10:
                         st.write(f"... and {len(names_preview) - 10} more names")
@@ -136,31 +287,28 @@ def render_unverified_caregivers_section():
                             # Process and add names
                             new_records = []
                             now = datetime.now().isoformat()
-                            
-                            for name in names_preview:
-                                if name and str(name).strip():
-                                    clean_name = str(name).strip()
-                                    
-                                    # Check if name already exists
-                                    if not unverified_df[unverified_df['name'].str.lower() == clean_name.lower()].empty:
-                                        continue  # Skip duplicates
-                                    
-                                    new_record = {
-                                        "unverified_id": generate_unverified_id(clean_name),
-                                        "name": clean_name,
-                                        "status": "pending",
-                                        "upload_date": now,
-                                        "notes": f"Uploaded from {uploaded_file.name}",
-                                        "verified_date": None,
-                                        "verified_by": None
-                                    }
-                                    new_records.append(new_record)
+
+                            # Skip blanks and names already on the list (case-insensitive), via one hashed set
+                            clean_names = pd.Series(names_preview, dtype=object).astype(str).str.strip()
+                            existing = set(unverified_df['_name_lower'].dropna())
+                            keep = clean_names.ne("") & ~clean_names.str.lower().isin(existing)
+
+                            names_to_add = clean_names[keep].tolist()
+                            for unverified_id, clean_name in zip(generate_unverified_ids(names_to_add), names_to_add):
+                                new_record = {
+                                    "unverified_id": unverified_id,
+                                    "name": clean_name,
+                                    "status": "pending",
+                                    "upload_date": now,
+                                    "notes": f"Uploaded from {uploaded_file.name}",
+                                    "verified_date": None,
+                                    "verified_by": None
+                                }
+                                new_records.append(new_record)
                             
                             if new_records:
                                 # Add to existing data
-                                new_df = pd.DataFrame(new_records)
-                                updated_df = pd.concat([unverified_df, new_df], ignore_index=True)
-                                save_unverified_data(updated_df)
+                                append_unverified_data(pd.DataFrame(new_records))
                                 
                                 st.success(f"✅ Successfully added {len(new_records)} new names to unverified list!")
                                 st.rerun()
@@ -190,70 +338,52 @@ def render_unverified_caregivers_section():
             with filter_col2:
                 search_name = st.text_input("🔍 Search by name:", "")
             
-            # Apply filters
-            filtered_df = unverified_df.copy()
+            # Apply filters as one row mask; with no filter active the loaded frame is used as is
+            mask = np.ones(len(unverified_df), dtype=bool)
             
             if status_filter != "All":
-                filtered_df = filtered_df[filtered_df['status'] == status_filter]
+                mask &= (unverified_df['status'] == status_filter).to_numpy(dtype=bool)
             
             if search_name:
-                filtered_df = filtered_df[
-                    filtered_df['name'].str.contains(search_name, case=False, na=False)
-                ]
+                # Literal match on the pre-lowered names: pyarrow's match_substring kernel, no case folding per row
+                mask &= unverified_df['_name_lower'].str.contains(
+                    search_name.lower(), na=False, regex=False).to_numpy(dtype=bool)
+            
+            filtered_df = unverified_df if mask.all() else unverified_df[mask]
             
             # Display summary
             st.write(f"**Showing {len(filtered_df)} of {len(unverified_df)} records**")
             
             # Status summary
-            status_summary = unverified_df['status'].value_counts()
+            status_summary = get_unverified_stats(unverified_df)
             summary_col1, summary_col2, summary_col3 = st.columns(3)
             
             with summary_col1:
-                pending_count = status_summary.get('pending', 0)
-                st.metric("⏳ Pending", pending_count)
+                st.metric("⏳ Pending", status_summary['pending'])
             
             with summary_col2:
-                verified_count = status_summary.get('verified', 0)
-                st.metric("✅ Verified", verified_count)
+                st.metric("✅ Verified", status_summary['verified'])
             
             with summary_col3:
-                rejected_count = status_summary.get('rejected', 0)
-                st.metric("❌ Rejected", rejected_count)
+                st.metric("❌ Rejected", status_summary['rejected'])
             
             # Display and edit data
             if not filtered_df.empty:
                 st.markdown("---")
                 
                 # Editable dataframe
-                edited_df = st.data_editor(
+                st.data_editor(
                     filtered_df,
                     use_container_width=True,
                     hide_index=True,
-                    column_config={
-                        "unverified_id": st.column_config.TextColumn("ID", disabled=True, width="small"),
-                        "name": st.column_config.TextColumn("Name", width="medium"),
-                        "status": st.column_config.SelectboxColumn(
-                            "Status",
-                            options=["pending", "verified", "rejected"],
-                            width="small"
-                        ),
-                        "upload_date": st.column_config.DatetimeColumn("Upload Date", disabled=True, width="medium"),
-                        "notes": st.column_config.TextColumn("Notes", width="large"),
-                        "verified_date": st.column_config.DatetimeColumn("Verified Date", disabled=True, width="medium"),
-                        "verified_by": st.column_config.TextColumn("Verified By", disabled=True, width="medium")
-                    },
+                    column_config=_UNVERIFIED_COLUMN_CONFIG,
                     key="unverified_editor"
                 )
                 
                 # Save changes
                 if st.button("💾 Save Changes"):
-                    # Update the main dataframe with changes
-                    for idx, row in edited_df.iterrows():
-                        original_idx = unverified_df[unverified_df['unverified_id'] == row['unverified_id']].index
-                        if not original_idx.empty:
-                            unverified_df.loc[original_idx[0]] = row
-                    
-                    save_unverified_data(unverified_df)
+                    # Only the cells edited here are written; other sessions' changes to other cells are kept
+                    save_unverified_data(editor_changes(filtered_df, st.session_state["unverified_editor"]["edited_rows"]))
                     st.success("✅ Changes saved successfully!")
                     st.rerun()
                 
@@ -265,30 +395,19 @@ def render_unverified_caregivers_section():
                 
                 with bulk_col1:
                     if st.button("✅ Mark All Filtered as Verified"):
-                        for idx in filtered_df.index:
-                            unverified_df.loc[idx, 'status'] = 'verified'
-                            unverified_df.loc[idx, 'verified_date'] = datetime.now().isoformat()
-                            unverified_df.loc[idx, 'verified_by'] = 'Bulk Action'
-                        
-                        save_unverified_data(unverified_df)
+                        save_unverified_data(status_changes(filtered_df['unverified_id'], 'verified', 'Bulk Action'))
                         st.success("✅ All filtered caregivers marked as verified!")
                         st.rerun()
                 
                 with bulk_col2:
                     if st.button("❌ Mark All Filtered as Rejected"):
-                        for idx in filtered_df.index:
-                            unverified_df.loc[idx, 'status'] = 'rejected'
-                            unverified_df.loc[idx, 'verified_date'] = datetime.now().isoformat()
-                            unverified_df.loc[idx, 'verified_by'] = 'Bulk Action'
-                        
-                        save_unverified_data(unverified_df)
+                        save_unverified_data(status_changes(filtered_df['unverified_id'], 'rejected', 'Bulk Action'))
                         st.success("❌ All filtered caregivers marked as rejected!")
                         st.rerun()
                 
                 with bulk_col3:
                     if st.button("🗑️ Delete All Filtered"):
-                        unverified_df = unverified_df[~unverified_df.index.isin(filtered_df.index)]
-                        save_unverified_data(unverified_df)
+                        save_unverified_data(deleted_ids=filtered_df['unverified_id'].to_numpy())
                         st.success("🗑️ All filtered caregivers deleted!")
                         st.rerun()
     
@@ -304,85 +423,52 @@ def render_unverified_caregivers_section():
         else:
             st.write(f"**Pending caregivers ({len(pending_df)}):**")
             
+            # One page of expanders per rerun instead of one per pending caregiver
+            pages = -(-len(pending_df) // PENDING_PAGE_SIZE)
+            page = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1) if pages > 1 else 1
+            start = (page - 1) * PENDING_PAGE_SIZE
+            page_df = pending_df.iloc[start:start + PENDING_PAGE_SIZE]
+            if pages > 1:
+                st.caption(f"Showing {start + 1}–{start + len(page_df)} of {len(pending_df)}")
+            
             # Display pending caregivers
-            for idx, row in pending_df.iterrows():
-                with st.expander(f"📋 {row['name']}"):
-                    st.write(f"**ID:** {row['unverified_id']}")
-                    st.write(f"**Upload Date:** {row['upload_date']}")
-                    st.write(f"**Notes:** {row['notes']}")
+            for row in page_df.itertuples():
+                with st.expander(f"📋 {row.name}"):
+                    st.write(f"**ID:** {row.unverified_id}")
+                    st.write(f"**Upload Date:** {row.upload_date}")
+                    st.write(f"**Notes:** {row.notes}")
                     
                     # Verification form
                     col1, col2 = st.columns(2)
                     
                     with col1:
-                        if st.button("✅ Verify", key=f"verify_{row['unverified_id']}"):
+                        if st.button("✅ Verify", key=f"verify_{row.unverified_id}"):
                             # Update status to verified
-                            unverified_df.loc[idx, 'status'] = 'verified'
-                            unverified_df.loc[idx, 'verified_date'] = datetime.now().isoformat()
-                            unverified_df.loc[idx, 'verified_by'] = 'Manual Verification'
-                            
-                            save_unverified_data(unverified_df)
-                            st.success(f"✅ {row['name']} verified successfully!")
+                            save_unverified_data(status_changes([row.unverified_id], 'verified', 'Manual Verification'))
+                            st.success(f"✅ {row.name} verified successfully!")
                             st.rerun()
                     
                     with col2:
-                        if st.button("❌ Reject", key=f"reject_{row['unverified_id']}"):
+                        if st.button("❌ Reject", key=f"reject_{row.unverified_id}"):
                             # Update status to rejected
-                            unverified_df.loc[idx, 'status'] = 'rejected'
-                            unverified_df.loc[idx, 'verified_date'] = datetime.now().isoformat()
-                            unverified_df.loc[idx, 'verified_by'] = 'Manual Verification'
-                            
-                            save_unverified_data(unverified_df)
-                            st.warning(f"❌ {row['name']} rejected!")
+                            save_unverified_data(status_changes([row.unverified_id], 'rejected', 'Manual Verification'))
+                            st.warning(f"❌ {row.name} rejected!")
                             st.rerun()
 
-def get_unverified_stats():
-    """Get statistics for unverified caregivers"""
-    try:
-        unverified_df = load_unverified_data()
-        if unverified_df.empty:
-            return {
-                'total': 0,
-                'pending': 0,
-                'verified': 0,
-                'rejected': 0
-            }
-        
-        status_counts = unverified_df['status'].value_counts()
-        return {
-            'total': len(unverified_df),
-            'pending': status_counts.get('pending', 0),
-            'verified': status_counts.get('verified', 0),
-            'rejected': status_counts.get('rejected', 0)
-        }
-    except Exception as e:
-        logger.error(f"Error getting unverified stats: {str(e)}")
-        return {
-            'total': 0,
-            'pending': 0,
-            'verified': 0,
-            'rejected': 0
-        }
+def _status_counts(df: pd.DataFrame) -> dict:
+    """Total and per-status counts, from one bincount over the status category codes"""
+    status = df["status"]
+    if not isinstance(status.dtype, pd.CategoricalDtype):
+        status = _with_categories(status, STATUSES)
+    codes = status.cat.codes.to_numpy()
+    counts = np.bincount(codes[codes >= 0], minlength=len(STATUSES))
+    return {'total': len(df), **{name: int(counts[i]) for i, name in enumerate(STATUSES)}}
 
-def get_unverified_stats():
-    """Get statistics for unverified caregivers"""
+@st.cache_data(show_spinner=False, max_entries=2)
+def _unverified_stats_cached(mtime: float):
+    """Status counts for one on-disk version of the unverified file"""
     try:
-        unverified_df = load_unverified_data()
-        if unverified_df.empty:
-            return {
-                'total': 0,
-                'pending': 0,
-                'verified': 0,
-                'rejected': 0
-            }
-        
-        status_counts = unverified_df['status'].value_counts()
-        return {
-            'total': len(unverified_df),
-            'pending': status_counts.get('pending', 0),
-            'verified': status_counts.get('verified', 0),
-            'rejected': status_counts.get('rejected', 0)
-        }
+        return _status_counts(load_unverified_data())
     except Exception as e:
         logger.error(f"Error getting unverified stats: {str(e)}")
         return {
@@ -391,3 +477,10 @@ def get_unverified_stats():
             'verified': 0,
             'rejected': 0
         }
+
+def get_unverified_stats(df: pd.DataFrame | None = None):
+    """Get statistics for unverified caregivers; pass an already loaded list to count it directly"""
+    if df is not None:
+        return _status_counts(df)
+    ensure_unverified_store()
+    return _unverified_stats_cached(os.path.getmtime(UNVERIFIED_PARQUET))